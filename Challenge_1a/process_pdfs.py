@@ -1,67 +1,366 @@
 import os
 import json
 import re
+import functools
+import hashlib
+import importlib.util
 from pathlib import Path
-from collections import defaultdict, Counter
-import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
 import math
+import numpy as np
 from typing import List, Dict, Tuple, Optional
-from multilingual_headings import MultilingualHeadingDetector
 
-def extract_title_and_outline(pdf_path):
-    """Extract title and outline from PDF with enhanced multilingual support."""
-    doc = fitz.open(pdf_path)
+# Precompiled heading patterns used by the enhanced detection passes.
+# Numbering/lettering patterns in the order detect_headings_by_pattern_enhanced
+# tries them, with the confidence of the first one that matches.
+PATTERN_CONFIDENCE = (
+    (re.compile(r'^\d+\.?\s+[A-Z]'), 0.9),
+    (re.compile(r'^\d+\.\d+\.?\s+[A-Z]'), 0.9),
+    (re.compile(r'^\d+\.\d+\.\d+\.?\s+[A-Z]'), 0.9),
+    (re.compile(r'^(?:\d+\.)*\d+\s+[A-Z]'), 0.8),  # Multi-level numbering
+    (re.compile(r'^[IVX]+\.?\s+[A-Z]'), 0.8),  # Roman numerals
+    (re.compile(r'^[A-Z]\.?\s+[A-Z]'), 0.7),  # Lettered headings
+)
+# The same table as one alternation: the regex engine tries the branches in
+# order, so a single match() finds the first matching pattern and lastgroup
+# names it
+NUMBERING_PATTERN_RE = re.compile('|'.join(
+    f'(?P<p{i}>{pattern.pattern})' for i, (pattern, _) in enumerate(PATTERN_CONFIDENCE)
+))
+NUMBERING_CONFIDENCE = {f'p{i}': confidence for i, (_, confidence) in enumerate(PATTERN_CONFIDENCE)}
+TITLE_CASE_RE = re.compile(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$')
+ALL_CAPS_LINE_RE = re.compile(r'^[A-Z][A-Z\s]+[A-Z]$')
+TOC_ENTRY_RE = re.compile(r'^[A-Z].*\.\.\.*\d+$')
+PLUS_JOINED_RE = re.compile(r'^[A-Z\s]+\+[A-Z\s]+')
+NUMBER_ONLY_RE = re.compile(r'^\d+\.$')
+MAJOR_NUMBERED_RE = re.compile(r'^\d+\.?\s+(overview|introduction|conclusion|summary)')
+SUBSECTION_NUMBER_RE = re.compile(r'^\d+\.\d+')
+PAGE_NUMBER_RE = re.compile(r'^(page\s*)?\d+$')
+
+# Precompiled patterns for the original (non-enhanced) and fast detection paths
+NUMBERED_HEADING_RE = re.compile(r'^\d+\.?\s+[A-Z]')
+NUMBERED_H1_RE = re.compile(r'^\d+\.\s+[A-Z]')
+NUMBERED_H2_RE = re.compile(r'^\d+\.\d+\s+[A-Z]')
+NUMBERED_H3_RE = re.compile(r'^\d+\.\d+\.\d+\s+[A-Z]')
+ROMAN_HEADING_RE = re.compile(r'^[IVX]+\.\s+[A-Z]')
+LETTERED_HEADING_RE = re.compile(r'^[A-Z]\.\s+[A-Z]')
+NUMBERED_PREFIX_RE = re.compile(r'^\d+[\.\s]')
+NUMBERED_LINE_RE = re.compile(r'^\d+\.?\s+')
+SUBSECTION_LINE_RE = re.compile(r'^\d+\.\d+\s+')
+SECTION_NUMBER_ONLY_RE = re.compile(r'^\d+(\.\d+)*$')
+TITLE_LINE_RE = re.compile(r'^[A-Z][A-Za-z\s\-–:]+$')
+CAPITALIZED_LINE_RE = re.compile(r'^[A-Z][A-Za-z\s\-–]+$')
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+TRAILING_DOTS_RE = re.compile(r'[\.]+$')
+
+# Keyword lists for the structure and heuristic detection passes
+STRUCTURE_HEADING_KEYWORDS = (
+    'introduction', 'overview', 'conclusion', 'summary', 'background',
+    'methodology', 'results', 'discussion', 'abstract', 'contents',
+    'chapter', 'section', 'part', 'appendix', 'index', 'references',
+    'objectives', 'goals', 'purpose', 'scope', 'definition', 'problem',
+    'solution', 'analysis', 'findings', 'recommendations', 'future',
+    'related', 'work', 'literature', 'review', 'evaluation', 'implementation'
+)
+STRUCTURE_MAJOR_HEADINGS = ('overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents')
+SECTION_STARTERS = frozenset([
+    'part', 'chapter', 'section', 'subsection', 'topic', 'lesson',
+    'unit', 'module', 'step', 'phase', 'stage', 'level', 'grade'
+])
+
+# Keyword lists for apply_heading_hierarchy_enhanced
+HIERARCHY_SKIP_WORDS = ('page', 'copyright', '©', 'www', 'http', 'email', '@', 'version')
+FORM_FIELD_PREFIXES = ('name of', 'date of', 'whether', 'if so', 'home town')
+FORM_FIELD_SUFFIXES = ('servant', 'service', 'government', 'book', 'ltc', 'employed', 'temporary')
+FORM_FIELD_LABELS = frozenset(['designation', 'service', 'age', 'name', 'relationship', 's.no', 'date', 'rs.'])
+MAJOR_HEADING_WORDS = frozenset(['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents'])
+MAJOR_HEADING_TITLES = MAJOR_HEADING_WORDS | {'table of contents'}
+MAJOR_HEADING_PREFIXES = tuple(f'{word} ' for word in sorted(MAJOR_HEADING_TITLES))
+STRUCTURE_MAJOR_PREFIXES = tuple(f'{word} ' for word in STRUCTURE_MAJOR_HEADINGS)
+
+# Narrower form-field prefix and label sets used by extract_outline_fast_enhanced
+FAST_FORM_FIELD_PREFIXES = ('name of', 'date of', 'whether')
+FAST_FORM_FIELD_LABELS = frozenset(['designation', 'service', 'age', 'name', 'relationship'])
+
+# Keyword lists for the legacy and fast heuristic passes
+STRUCTURE_INDICATOR_WORDS = (
+    'introduction', 'overview', 'conclusion', 'summary', 'background',
+    'methodology', 'results', 'discussion', 'abstract', 'contents'
+)
+HEADING_INDICATOR_WORDS = (
+    'introduction', 'overview', 'background', 'methodology', 'results',
+    'conclusion', 'discussion', 'summary', 'abstract', 'contents',
+    'chapter', 'section', 'part', 'appendix', 'index', 'references'
+)
+LIKELY_HEADING_SKIP_WORDS = ('page', 'copyright', '©', 'version', 'date', 'isbn')
+LIKELY_HEADING_WORDS = (
+    'introduction', 'overview', 'background', 'methodology', 'results',
+    'conclusion', 'discussion', 'summary', 'abstract', 'acknowledgment',
+    'references', 'bibliography', 'appendix', 'contents', 'index', 'revision',
+    'history', 'table', 'business', 'outcomes', 'content', 'trademarks',
+    'documents', 'web', 'sites', 'audience', 'career', 'paths', 'learning',
+    'objectives', 'entry', 'requirements', 'structure', 'course', 'duration',
+    'keeping', 'current', 'syllabus', 'agile', 'tester', 'extension', 'foundation',
+    'level'
+)
+FAST_HEADING_WORDS = (
+    'introduction', 'overview', 'conclusion', 'summary', 'background',
+    'methodology', 'results', 'discussion', 'abstract'
+)
+QUICK_HEADING_WORDS = ('overview', 'introduction', 'summary')
+
+def keyword_pattern(words):
+    """Build a regex that finds any of `words` as a substring.
+    
+    The words are merged into a prefix trie ("in(?:dex|troduction)"), so
+    each text position is checked against one branch per distinct first
+    letter instead of once per word. Only whether a match exists is
+    meaningful; a word that extends a shorter one may be cut short.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = None
+    
+    def branch(node):
+        if '' in node:
+            return ''
+        alternatives = [re.escape(ch) + branch(child) for ch, child in sorted(node.items())]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return '(?:' + '|'.join(alternatives) + ')'
+    
+    return branch(trie)
+
+# Substring tests against the keyword lists above, one trie-shaped regex
+# scan each instead of one `in` scan per keyword
+STRUCTURE_KEYWORD_RE = re.compile(keyword_pattern(STRUCTURE_HEADING_KEYWORDS))
+STRUCTURE_MAJOR_RE = re.compile(keyword_pattern(STRUCTURE_MAJOR_HEADINGS))
+HIERARCHY_SKIP_RE = re.compile(keyword_pattern(HIERARCHY_SKIP_WORDS))
+STRUCTURE_INDICATOR_RE = re.compile(keyword_pattern(STRUCTURE_INDICATOR_WORDS))
+HEADING_INDICATOR_RE = re.compile(keyword_pattern(HEADING_INDICATOR_WORDS))
+LIKELY_HEADING_SKIP_RE = re.compile(keyword_pattern(LIKELY_HEADING_SKIP_WORDS))
+LIKELY_HEADING_RE = re.compile(keyword_pattern(LIKELY_HEADING_WORDS))
+FAST_HEADING_RE = re.compile(keyword_pattern(FAST_HEADING_WORDS))
+QUICK_HEADING_RE = re.compile(keyword_pattern(QUICK_HEADING_WORDS))
+
+# Most text lines the intensive extractor is projected to visit per document
+# (50 pages of a dense 100-line layout); denser documents get fewer pages
+ENHANCED_LINE_BUDGET = 5000
+
+# On-disk (title, outline) cache; set PDF_OUTLINE_CACHE_DIR="" to disable.
+# Bump OUTLINE_CACHE_VERSION whenever extraction results change.
+OUTLINE_CACHE_DIR = os.environ.get("PDF_OUTLINE_CACHE_DIR", ".pdf_outline_cache")
+OUTLINE_CACHE_VERSION = 4
+
+# Embedding model behind get_multilingual_detector; part of the cache key
+MULTILINGUAL_MODEL_NAME = "distiluse-base-multilingual-cased-v2"
+MULTILINGUAL_MODEL_BACKEND = "sentence-transformers"
+
+def write_file_atomic(path, text):
+    """Write text to path via a per-process temp file and rename, so parallel
+    workers never read a half-written file. Failures are ignored."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(text, encoding="utf-8")
+        os.replace(tmp_file, path)
+    except OSError:
+        pass
+
+class UncachedResult(tuple):
+    """A (title, outline) result that disk_cache returns but does not store."""
+
+@functools.cache
+def detector_fingerprint():
+    """Describe the multilingual detector configuration this process would use.
+    
+    Covers the embedding model and which language identifier
+    multilingual_headings will pick (fastText with LID_MODEL_PATH, CLD3 or
+    langdetect), without importing either module.
+    """
+    lid_model_path = os.environ.get("LID_MODEL_PATH", "lid.176.ftz")
+    try:
+        st = os.stat(lid_model_path)
+        lid_model = f"{lid_model_path}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        lid_model = f"{lid_model_path}:missing"
+    installed = [name for name in ("fasttext", "gcld3") if importlib.util.find_spec(name)]
+    return "\0".join([MULTILINGUAL_MODEL_BACKEND, MULTILINGUAL_MODEL_NAME, lid_model, *installed])
+
+def disk_cache(cache_dir):
+    """Cache (title, outline) results on disk, keyed by a hash of the PDF bytes.
+    
+    A second, stat-keyed entry maps (path, size, mtime) to that hash, so a
+    repeat run over unchanged files finds its result without reading the PDF.
+    Both keys include detector_fingerprint(), so changing the detector setup
+    never serves results computed under another one, and results the
+    function marks as UncachedResult are returned without being stored.
+    """
+    def decorator(func):
+        if not cache_dir:
+            return func
+        
+        def load_entry(cache_file):
+            try:
+                with open(cache_file, encoding="utf-8") as f:
+                    cached = json.load(f)
+                return cached["title"], cached["outline"]
+            except (OSError, ValueError, KeyError, TypeError):
+                return None
+        
+        @functools.wraps(func)
+        def wrapper(pdf_path):
+            pdf_path = Path(pdf_path)
+            cache_root = Path(cache_dir)
+            
+            st = pdf_path.stat()
+            fingerprint = detector_fingerprint()
+            stat_key = hashlib.blake2b(
+                f"{pdf_path.resolve()}\0{st.st_size}\0{st.st_mtime_ns}\0{fingerprint}".encode(),
+                digest_size=16
+            ).hexdigest()
+            stat_file = cache_root / f"v{OUTLINE_CACHE_VERSION}-stat-{stat_key}.txt"
+            
+            # Fast path: the file is unchanged since it was last hashed
+            try:
+                digest = stat_file.read_text(encoding="utf-8").strip()
+            except OSError:
+                digest = None
+            if digest:
+                cached = load_entry(cache_root / f"v{OUTLINE_CACHE_VERSION}-{digest}.json")
+                if cached is not None:
+                    return cached
+            
+            pdf_bytes = pdf_path.read_bytes()
+            hasher = hashlib.blake2b(fingerprint.encode(), digest_size=16)
+            hasher.update(pdf_bytes)
+            digest = hasher.hexdigest()
+            cache_file = cache_root / f"v{OUTLINE_CACHE_VERSION}-{digest}.json"
+            
+            cached = load_entry(cache_file)
+            if cached is not None:
+                write_file_atomic(stat_file, digest)
+                return cached
+            
+            # Hand the bytes already read for hashing to the extractor
+            result = func(pdf_path, pdf_bytes)
+            if isinstance(result, UncachedResult):
+                return tuple(result)
+            title, outline = result
+            
+            write_file_atomic(cache_file, json.dumps({"title": title, "outline": outline}, ensure_ascii=False))
+            write_file_atomic(stat_file, digest)
+            
+            return title, outline
+        return wrapper
+    return decorator
+
+@disk_cache(OUTLINE_CACHE_DIR)
+def extract_title_and_outline(pdf_path, pdf_bytes=None):
+    """Extract title and outline from PDF with enhanced multilingual support.
+    
+    pdf_bytes, when given, is the file content already in memory and is
+    parsed directly instead of reopening pdf_path. Results of the fallback
+    taken when the multilingual detector raises come back as UncachedResult,
+    so a transient detector failure is not cached.
+    """
+    # Imported here so disk-cache hits never load PyMuPDF
+    import fitz  # PyMuPDF
+    if pdf_bytes is not None:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    else:
+        doc = fitz.open(str(pdf_path))
     
     try:
         # SPEED HEURISTIC 1: Check PDF bookmarks first (fastest method)
         pdf_outline = extract_pdf_outline(doc)
-        if pdf_outline["outline"] and len(pdf_outline["outline"]) > 3:
-            return pdf_outline["title"], pdf_outline["outline"]
+        if bookmarks_suffice(pdf_outline["outline"], len(doc)):
+            # Untitled documents keep their bookmarks; the file name stands in
+            title = pdf_outline["title"] or Path(pdf_path).stem
+            return title, pdf_outline["outline"]
+        
+        # Nothing past page 50 is analysed; drop the rest of the page tree now
+        # that the bookmarks (which may point beyond it) have been read
+        if len(doc) > 50:
+            doc.select(list(range(50)))
+        
+        # Parsed pages shared by every extraction pass below
+        page_cache = {}
         
         # SPEED HEURISTIC 2: Minimal font analysis on first few pages only
         quick_sample_pages = min(len(doc), 3)  # Analyze only first 3 pages initially
-        sample_blocks = extract_text_blocks_optimized(doc, quick_sample_pages)
+        sample_blocks = extract_text_blocks_optimized(doc, quick_sample_pages, page_cache)
+        
+        # A short bookmark list is still ground truth; it is merged into the
+        # detected headings below instead of being discarded
+        anchors = pdf_outline["outline"]
         
         if sample_blocks:
             # Quick pattern check - if we find clear headings in first 3 pages, continue with limited analysis
             quick_headings = detect_quick_patterns(sample_blocks)
             if len(quick_headings) >= 2:  # If we found some headings, do limited full analysis
                 max_pages = min(len(doc), 20)  # Reduced from 50 to 20 pages
-                text_blocks = extract_text_blocks_optimized(doc, max_pages)
+                text_blocks = extract_text_blocks_optimized(doc, max_pages, page_cache)
             else:
                 # SPEED HEURISTIC 3: Fall back to intensive analysis only if needed
                 max_pages = min(len(doc), 50)  # Full analysis as fallback
-                text_blocks = extract_text_blocks_with_metadata_enhanced(doc, max_pages)
+                
+                # Cap the intensive pass by projected work: dense pages (from
+                # the already-parsed sample) get fewer pages analysed
+                lines_per_page = estimate_lines_per_page(doc, quick_sample_pages, page_cache)
+                if lines_per_page * max_pages > ENHANCED_LINE_BUDGET:
+                    max_pages = max(quick_sample_pages, int(ENHANCED_LINE_BUDGET // lines_per_page))
+                text_blocks = extract_text_blocks_with_metadata_enhanced(doc, max_pages, page_cache)
         else:
-            return "", []
+            return pdf_outline["title"], anchors
         
         if not text_blocks:
-            return "", []
+            return pdf_outline["title"], anchors
         
         # NEW: Try multilingual enhanced detection first
+        detector_failed = False
         try:
             title, outline = extract_title_and_outline_multilingual(text_blocks)
             if outline and len(outline) >= 2:  # If multilingual detection finds good results
-                return title, outline
+                return title, merge_bookmark_anchors(outline, anchors, title)
         except Exception as e:
             print(f"Warning: Multilingual detection failed, falling back to original method: {e}")
+            detector_failed = True
         
         # Fallback to original method
         title = extract_title_fast(text_blocks) if len(quick_headings) >= 2 else extract_title_advanced(text_blocks)
         outline = extract_outline_fast_enhanced(text_blocks, title) if len(quick_headings) >= 2 else extract_outline_advanced_enhanced(text_blocks, title)
         
-        return title, outline
+        result = (title, merge_bookmark_anchors(outline, anchors, title))
+        return UncachedResult(result) if detector_failed else result
         
     finally:
         doc.close()
 
+@functools.cache
+def get_multilingual_detector():
+    """Load the multilingual heading detector once per process."""
+    # Deferred import: loading the NLP stack costs seconds
+    from multilingual_headings import MultilingualHeadingDetector
+    return MultilingualHeadingDetector(MULTILINGUAL_MODEL_NAME, MULTILINGUAL_MODEL_BACKEND)
+
+def preload_multilingual_detector():
+    """Worker-pool initializer that loads the detector before the first file."""
+    try:
+        get_multilingual_detector()
+    except Exception as e:
+        # Leave it to the per-file fallback rather than breaking the pool
+        print(f"Warning: Could not preload multilingual detector: {e}")
+
 def extract_title_and_outline_multilingual(text_blocks: List[Dict]) -> Tuple[str, List[Dict]]:
     """Extract title and outline using multilingual detection."""
     # Initialize multilingual detector (cached after first use)
-    if not hasattr(extract_title_and_outline_multilingual, 'detector'):
-        extract_title_and_outline_multilingual.detector = MultilingualHeadingDetector()
-    
-    detector = extract_title_and_outline_multilingual.detector
+    detector = get_multilingual_detector()
     
     # Extract title using advanced method
     title = extract_title_advanced(text_blocks)
@@ -80,6 +379,38 @@ def extract_title_and_outline_multilingual(text_blocks: List[Dict]) -> Tuple[str
     
     return title, outline
 
+def bookmarks_suffice(outline, page_count):
+    """Whether a bookmark outline can be returned without text analysis.
+    
+    More than three entries always qualify. Multi-page documents (over five
+    pages) also qualify with fewer, as long as there are at least two and at
+    least one per 50 pages.
+    """
+    if len(outline) > 3:
+        return True
+    return page_count > 5 and len(outline) >= max(2, page_count // 50)
+
+def anchor_key(text):
+    """Case- and whitespace-insensitive key for comparing heading texts."""
+    return "".join(text.split()).lower()
+
+def merge_bookmark_anchors(outline, bookmarks, title):
+    """Merge a partial bookmark outline into the detected headings.
+    
+    Bookmarks win over a detected heading with the same text on the same
+    page, and a bookmark that only repeats the title is dropped. The result
+    is ordered by page, with bookmarks first on their page.
+    """
+    title_key = anchor_key(title)
+    anchors = [b for b in bookmarks if b["page"] >= 1 and anchor_key(b["text"]) != title_key]
+    if not anchors:
+        return outline
+    
+    anchor_keys = {(anchor_key(b["text"]), b["page"]) for b in anchors}
+    merged = anchors + [h for h in outline if (anchor_key(h["text"]), h["page"]) not in anchor_keys]
+    merged.sort(key=itemgetter("page"))
+    return merged
+
 def extract_pdf_outline(doc):
     """Extract outline from PDF bookmarks/table of contents."""
     title = ""
@@ -91,17 +422,16 @@ def extract_pdf_outline(doc):
         if metadata and metadata.get("title"):
             title = metadata["title"].strip()
         
-        # Get outline/bookmarks
-        toc = doc.get_toc(simple=False)
+        # Get outline/bookmarks as flat [level, title, page] rows; the
+        # link details simple=False resolves per entry are never used
+        toc = doc.get_toc(simple=True)
         if toc:
-            for item in toc:
-                level = item[0]  # Level (1=H1, 2=H2, etc.)
-                text = item[1].strip()  # Title text
-                page = item[2]  # Page number
+            # Map level to H1, H2, H3 format
+            level_map = {1: "H1", 2: "H2", 3: "H3"}
+            for level, text, page in toc:
+                text = text.strip()
                 
                 if text and len(text) > 2:
-                    # Map level to H1, H2, H3 format
-                    level_map = {1: "H1", 2: "H2", 3: "H3"}
                     level_str = level_map.get(min(level, 3), "H3")
                     
                     outline.append({
@@ -150,6 +480,7 @@ def extract_text_blocks_with_metadata(doc):
                             
                             text_blocks.append({
                                 "text": full_line_text,
+                                "text_lower": full_line_text.lower(),
                                 "page": page_num + 1,
                                 "font": first_span["font"],
                                 "size": first_span["size"],
@@ -168,63 +499,125 @@ def extract_text_blocks_with_metadata(doc):
     
     return text_blocks
 
-def extract_text_blocks_with_metadata_enhanced(doc, max_pages):
+def estimate_lines_per_page(doc, sample_pages, page_cache=None):
+    """Average number of text lines over the first sample_pages pages."""
+    if sample_pages <= 0:
+        return 0.0
+    
+    line_count = 0
+    for page_num in range(sample_pages):
+        page_dict, _ = get_page_dict(doc, page_num, page_cache)
+        for block in page_dict["blocks"]:
+            line_count += len(block.get("lines", ()))
+    return line_count / sample_pages
+
+def get_page_dict(doc, page_num, page_cache=None):
+    """Return (page_dict, page_rect) for a page, parsing it once per cache."""
+    # Pages are parsed sequentially: PyMuPDF documents are not thread-safe and
+    # get_text holds the GIL, so parallelism comes from one process per PDF
+    if page_cache is None:
+        return parse_page(doc[page_num])
+    
+    cached = page_cache.get(page_num)
+    if cached is None:
+        cached = page_cache[page_num] = parse_page(doc[page_num])
+    return cached
+
+def parse_page(page):
+    """Return (page_dict, page_rect) with text blocks only.
+    
+    The extractors skip every block without "lines", so image blocks (and
+    the pixel data PyMuPDF copies into them) are left out of the dict.
+    """
+    return page.get_text("dict", flags=page_text_flags()), page.rect
+
+@functools.cache
+def page_text_flags():
+    """get_text flags for parse_page, resolved once per process.
+    
+    Whitespace and ligature preservation stay on: clearing them made no
+    measurable difference to parse time, and whitespace folding rewrites
+    characters such as no-break spaces inside block text.
+    """
+    import fitz  # PyMuPDF
+    return fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+def extract_text_blocks_with_metadata_enhanced(doc, max_pages, page_cache=None):
     """Enhanced text extraction for maximum heading detection."""
     text_blocks = []
     
     for page_num in range(max_pages):
-        page = doc[page_num]
-        page_dict = page.get_text("dict")
-        page_rect = page.rect
+        page_dict, page_rect = get_page_dict(doc, page_num, page_cache)
+        # Page-level fields are the same for every line on the page
+        page_no = page_num + 1
+        page_width = page_rect.width
+        page_height = page_rect.height
         
         for block in page_dict["blocks"]:
             if "lines" in block:
                 for line_idx, line in enumerate(block["lines"]):
-                    line_text_parts = []
                     line_bbox = line["bbox"]
+                    spans = line["spans"]
                     
-                    # Collect all spans in the line
-                    spans_info = []
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if text:
-                            line_text_parts.append(text)
-                            spans_info.append(span)
+                    if len(spans) == 1:
+                        # Most lines are a single span: take its fields as-is
+                        first_span = spans[0]
+                        full_line_text = first_span["text"].strip()
+                        if not full_line_text:
+                            continue
+                        
+                        avg_size = first_span["size"]
+                        flags_all = flags_any = first_span["flags"]
+                        same_font = True
+                    else:
+                        # Collect all spans in the line
+                        line_text_parts = []
+                        spans_info = []
+                        for span in spans:
+                            text = span["text"].strip()
+                            if text:
+                                line_text_parts.append(text)
+                                spans_info.append(span)
+                        
+                        if not spans_info:
+                            continue
+                        full_line_text = " ".join(line_text_parts)
+                        
+                        # Use the first span for primary font info
+                        first_span = spans_info[0]
+                        
+                        # Accumulate size and style over the spans in one pass:
+                        # AND-ed flags give "all spans", OR-ed flags "any span"
+                        size_sum = 0.0
+                        flags_all = flags_any = first_span["flags"]
+                        same_font = True
+                        for s in spans_info:
+                            size_sum += s["size"]
+                            flags_all &= s["flags"]
+                            flags_any |= s["flags"]
+                            same_font = same_font and s["font"] == first_span["font"]
+                        
+                        # Calculate average font size for the line
+                        avg_size = size_sum / len(spans_info)
                     
-                    if line_text_parts and spans_info:
-                        full_line_text = " ".join(line_text_parts).strip()
-                        if full_line_text:
-                            # Use the first span for primary font info
-                            first_span = spans_info[0]
-                            
-                            # Calculate average font size for the line
-                            avg_size = sum(s["size"] for s in spans_info) / len(spans_info)
-                            
-                            # Check if all spans are bold/italic
-                            all_bold = all(bool(s["flags"] & 16) for s in spans_info)
-                            all_italic = all(bool(s["flags"] & 2) for s in spans_info)
-                            any_bold = any(bool(s["flags"] & 16) for s in spans_info)
-                            
-                            text_blocks.append({
-                                "text": full_line_text,
-                                "page": page_num + 1,
-                                "font": first_span["font"],
-                                "size": avg_size,
-                                "flags": first_span["flags"],
-                                "bbox": line_bbox,
-                                "line_height": line_bbox[3] - line_bbox[1],
-                                "x_position": line_bbox[0],
-                                "y_position": line_bbox[1],
-                                "page_width": page_rect.width,
-                                "page_height": page_rect.height,
-                                "is_bold": all_bold,
-                                "any_bold": any_bold,
-                                "is_italic": all_italic,
-                                "char_count": len(full_line_text),
-                                "word_count": len(full_line_text.split()),
-                                "span_count": len(spans_info),
-                                "font_consistency": len(set(s["font"] for s in spans_info)) == 1
-                            })
+                    # Only fields some analysis reads are kept; each block
+                    # is a dict, so every extra key costs memory and a store
+                    text_blocks.append({
+                        "text": full_line_text,
+                        "text_lower": full_line_text.lower(),
+                        "page": page_no,
+                        "size": avg_size,
+                        "flags": first_span["flags"],
+                        "bbox": line_bbox,
+                        "x_position": line_bbox[0],
+                        "y_position": line_bbox[1],
+                        "page_width": page_width,
+                        "page_height": page_height,
+                        "is_bold": bool(flags_all & 16),
+                        "any_bold": bool(flags_any & 16),
+                        "word_count": len(full_line_text.split()),
+                        "font_consistency": same_font
+                    })
     
     return text_blocks
 
@@ -233,28 +626,18 @@ def extract_outline_advanced_enhanced(text_blocks: List[Dict], title: str) -> Li
     if not text_blocks:
         return []
     
-    # Analyze document structure
-    font_analysis = analyze_font_hierarchy_enhanced(text_blocks, title)
-    structure_analysis = analyze_document_structure(text_blocks)
+    # Numeric columns and header/footer classification are shared by the
+    # analysis and detection passes
+    columns = block_columns(text_blocks)
+    margin_mask = header_footer_mask(text_blocks, columns)
     
-    # Multi-pass heading detection with lower thresholds
-    headings = []
-    
-    # Pass 1: Font-based detection (more aggressive)
-    font_headings = detect_headings_by_font_enhanced(text_blocks, font_analysis, title)
-    headings.extend(font_headings)
-    
-    # Pass 2: Pattern-based detection (expanded patterns)
-    pattern_headings = detect_headings_by_pattern_enhanced(text_blocks, title)
-    headings.extend(pattern_headings)
-    
-    # Pass 3: Structure-based detection (more inclusive)
-    structure_headings = detect_headings_by_structure_enhanced(text_blocks, structure_analysis, title)
-    headings.extend(structure_headings)
+    # Analyze document structure
+    font_analysis = analyze_font_hierarchy_enhanced(text_blocks, title, margin_mask, columns)
+    structure_analysis = analyze_document_structure(text_blocks, columns)
     
-    # Pass 4: Heuristic-based detection for common heading characteristics
-    heuristic_headings = detect_headings_by_heuristics(text_blocks, title, font_analysis)
-    headings.extend(heuristic_headings)
+    # Font, pattern, structure and heuristic detection with lower thresholds
+    headings = detect_headings_fused_enhanced(text_blocks, font_analysis, structure_analysis, title, margin_mask,
+                                              columns)
     
     # Merge and deduplicate
     merged_headings = merge_heading_candidates(headings)
@@ -264,21 +647,48 @@ def extract_outline_advanced_enhanced(text_blocks: List[Dict], title: str) -> Li
     
     return final_outline
 
-def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str) -> Dict:
-    """Enhanced font analysis for better hierarchy detection."""
+def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str, margin_mask=None, columns=None) -> Dict:
+    """Enhanced font analysis for better hierarchy detection.
+    
+    margin_mask and columns, when given, are header_footer_mask(text_blocks)
+    and block_columns(text_blocks) computed by the caller.
+    """
+    
+    if columns is None:
+        columns = block_columns(text_blocks)
+    if margin_mask is None:
+        margin_mask = header_footer_mask(text_blocks, columns)
+    
     # Exclude title and common non-heading text
-    content_blocks = [b for b in text_blocks 
-                     if b["text"] != title and 
-                     not is_page_number(b["text"]) and 
-                     not is_header_footer(b, text_blocks) and
-                     len(b["text"]) > 2]
+    sizes = []
+    bold_flags = []
+    for b, in_margin, page_number in zip(text_blocks, margin_mask, columns["page_number"]):
+        if (b["text"] != title and 
+            len(b["text"]) > 2 and
+            not in_margin and
+            not page_number):
+            sizes.append(b["size"])
+            bold_flags.append(b.get("any_bold", False))
     
-    if not content_blocks:
+    if not sizes:
         return {}
     
-    # Analyze font size distribution
-    sizes = [b["size"] for b in content_blocks]
-    size_counter = Counter(round(s, 1) for s in sizes)
+    # Analyze font size distribution on 0.1pt buckets
+    buckets = size_buckets(sizes)
+    unique_buckets, first_index, inverse, counts = np.unique(
+        buckets, return_index=True, return_inverse=True, return_counts=True
+    )
+    bold_counts = np.bincount(inverse.ravel(), weights=np.asarray(bold_flags, dtype=np.float64),
+                              minlength=len(unique_buckets))
+    
+    # Keep first-occurrence order so ties for the body size resolve as before
+    size_counter = {}
+    bold_size_counter = {}
+    for i in np.argsort(first_index, kind="stable").tolist():
+        size = int(unique_buckets[i]) / 10
+        size_counter[size] = int(counts[i])
+        bold_size_counter[size] = int(bold_counts[i])
+    total_blocks = len(sizes)
     
     # Find body text size (most common, but exclude very small sizes)
     size_candidates = [(size, count) for size, count in size_counter.items() if size > 8.0]
@@ -289,7 +699,6 @@ def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str) -> Dict
     
     # Find heading sizes with improved logic for uniform documents
     heading_sizes = []
-    total_blocks = len(content_blocks)
     
     for size, count in size_counter.items():
         # Include larger sizes
@@ -297,8 +706,8 @@ def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str) -> Dict
             heading_sizes.append(size)
         # Include bold text of body size or slightly smaller
         elif size >= body_size - 1.0:
-            bold_blocks = [b for b in content_blocks if round(b["size"], 1) == size and b.get("any_bold", False)]
-            if bold_blocks and len(bold_blocks) < total_blocks * 0.5:
+            bold_count = bold_size_counter[size]
+            if bold_count and bold_count < total_blocks * 0.5:
                 heading_sizes.append(size)
     
     # Handle documents with minimal size variation
@@ -310,21 +719,20 @@ def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str) -> Dict
         single_size = heading_sizes[0]
         heading_sizes = [single_size + 1.0, single_size, single_size - 1.0]
     
-    # Sort heading sizes (largest first)
-    heading_sizes = sorted(list(set(heading_sizes)), reverse=True)
+    # Sort heading sizes in descending order (largest first) for correct
+    # H1/H2/H3 assignment; histogram keys and the synthesized sizes above
+    # are already distinct
+    heading_sizes.sort(reverse=True)
     
     # Map to hierarchy levels - CORRECT HIERARCHY: largest font = H1, smallest = H3
     size_to_level = {}
     level_names = ["H1", "H2", "H3"]
     
-    # Sort sizes in descending order (largest first) for correct H1/H2/H3 assignment
-    heading_sizes_sorted = sorted(heading_sizes, reverse=True)
-    
-    for i, size in enumerate(heading_sizes_sorted[:3]):  # Only top 3 sizes
+    for i, size in enumerate(heading_sizes[:3]):  # Only top 3 sizes
         size_to_level[size] = level_names[i]
     
     # Any remaining sizes get mapped to H3 (smallest)
-    for size in heading_sizes_sorted[3:]:
+    for size in heading_sizes[3:]:
         size_to_level[size] = "H3"
     
     return {
@@ -334,36 +742,79 @@ def analyze_font_hierarchy_enhanced(text_blocks: List[Dict], title: str) -> Dict
         "size_distribution": dict(size_counter)
     }
 
-def detect_headings_by_font_enhanced(text_blocks: List[Dict], font_analysis: Dict, title: str) -> List[Dict]:
-    """Enhanced font-based heading detection with lower thresholds."""
-    headings = []
+def detect_headings_fused_enhanced(text_blocks: List[Dict], font_analysis: Dict,
+                                   structure_analysis: Dict, title: str, margin_mask=None,
+                                   columns=None) -> List[Dict]:
+    """Font, pattern, structure and heuristic heading detection in one pass.
+    
+    Each block is scored by all four methods while its stripped text, word
+    split and rounded size are at hand. Candidates are kept in per-method
+    lists and concatenated in method order, so merging sees them in the same
+    order as four separate passes would produce. margin_mask and columns are
+    as for analyze_font_hierarchy_enhanced.
+    """
+    
+    if columns is None:
+        columns = block_columns(text_blocks)
+    if margin_mask is None:
+        margin_mask = header_footer_mask(text_blocks, columns)
+    page_number_mask = columns["page_number"]
+    # gaps[i] is the vertical distance from block i to block i + 1
+    gaps = np.diff(columns["y_position"]).tolist()
+    
+    font_headings = []
+    pattern_headings = []
+    structure_headings = []
+    heuristic_headings = []
+    
     size_to_level = font_analysis.get("size_to_level", {})
     body_size = font_analysis.get("body_size", 12.0)
+    significant_spacing = structure_analysis.get("significant_spacing", 15)
+    last_index = len(text_blocks) - 1
     
-    for block in text_blocks:
-        text = block["text"].strip()
+    # Loop-invariant thresholds
+    large_size = body_size + 0.5
+    larger_size = body_size + 1.5
+    near_body_size = body_size - 0.5
+    spacing_threshold = significant_spacing * 0.8
+    
+    # A document has only a handful of distinct rounded sizes, so the
+    # size-dependent part of the font score is memoized per size
+    size_scores = {}
+    
+    for i, block in enumerate(text_blocks):
+        text = block["text"]
+        text_len = len(text)
+        
+        if text == title or text_len < 3 or page_number_mask[i]:
+            continue
+        
+        words = text.split()
+        word_count = len(words)
         size = round(block["size"], 1)
+        y_position = block.get("y_position", 0)
+        any_bold = block.get("any_bold", False)
         
-        if (text != title and 
-            not is_page_number(text) and
-            not is_header_footer(block, text_blocks) and
-            len(text) > 2 and
-            len(text) < 200 and
-            block["word_count"] <= 20):
+        # Pass 1: Font-based detection (more aggressive)
+        if (text_len < 200 and
+            block["word_count"] <= 20 and
+            not margin_mask[i]):
             
-            confidence = 0
-            level = "H3"
-            
-            # Font size based detection
-            if size in size_to_level:
-                confidence += 0.6
-                level = size_to_level[size]
-            elif size > body_size + 0.5:
-                confidence += 0.4
-                level = "H2" if size > body_size + 1.5 else "H3"
+            # Font size based detection, evaluated once per distinct size
+            size_score = size_scores.get(size)
+            if size_score is None:
+                mapped_level = size_to_level.get(size)
+                if mapped_level is not None:
+                    size_score = (0.6, mapped_level)
+                elif size > large_size:
+                    size_score = (0.4, "H2" if size > larger_size else "H3")
+                else:
+                    size_score = (0, "H3")
+                size_scores[size] = size_score
+            confidence, level = size_score
             
             # Bold text detection
-            if block.get("any_bold", False):
+            if any_bold:
                 confidence += 0.4
                 if not level or level == "H3":
                     level = "H2"
@@ -376,125 +827,74 @@ def detect_headings_by_font_enhanced(text_blocks: List[Dict], font_analysis: Dic
                 confidence += 0.1
             
             if confidence > 0.4:  # Lower threshold
-                headings.append({
+                font_headings.append({
                     "text": text,
                     "level": level,
                     "page": block["page"],
                     "confidence": confidence,
                     "source": "font",
-                    "y_position": block.get("y_position", 0),
+                    "y_position": y_position,
                     "font_size": size
                 })
-    
-    return headings
-
-def detect_headings_by_pattern_enhanced(text_blocks: List[Dict], title: str) -> List[Dict]:
-    """Enhanced pattern-based detection with more patterns."""
-    headings = []
-    
-    for block in text_blocks:
-        text = block["text"].strip()
-        
-        if text == title or is_page_number(text) or len(text) < 3:
-            continue
         
+        # Pass 2: Pattern-based detection (expanded patterns)
         confidence = 0
         
         # Pattern recognition for confidence only - don't assign levels
-        if re.match(r'^\d+\.?\s+[A-Z]', text):
-            confidence = 0.9
-        elif re.match(r'^\d+\.\d+\.?\s+[A-Z]', text):
-            confidence = 0.9
-        elif re.match(r'^\d+\.\d+\.\d+\.?\s+[A-Z]', text):
-            confidence = 0.9
-        elif re.match(r'^(\d+\.)*\d+\s+[A-Z]', text):  # Multi-level numbering
-            confidence = 0.8
-        elif re.match(r'^[IVX]+\.?\s+[A-Z]', text):  # Roman numerals
-            confidence = 0.8
-        elif re.match(r'^[A-Z]\.?\s+[A-Z]', text):  # Lettered headings
-            confidence = 0.7
-        elif text.isupper() and len(text.split()) <= 10 and len(text) > 2:  # All caps
+        numbering = NUMBERING_PATTERN_RE.match(text)
+        if numbering:
+            confidence = NUMBERING_CONFIDENCE[numbering.lastgroup]
+        elif text.isupper() and word_count <= 10:  # All caps
             confidence = 0.6
-        elif (re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$', text) and 
-              len(text.split()) <= 12 and len(text) > 4):  # Title case
+        elif (TITLE_CASE_RE.match(text) and 
+              word_count <= 12 and text_len > 4):  # Title case
             confidence = 0.5
-        elif text.endswith('?') and len(text.split()) <= 10:  # Questions
+        elif text.endswith('?') and word_count <= 10:  # Questions
             confidence = 0.5
-        elif text.endswith(':') and len(text.split()) <= 8:  # Colon endings
+        elif text.endswith(':') and word_count <= 8:  # Colon endings
             confidence = 0.6
         
         if confidence > 0.4:
-            headings.append({
+            pattern_headings.append({
                 "text": text,
                 "level": None,  # No level assigned - will be determined by font size
                 "page": block["page"],
                 "confidence": confidence,
                 "source": "pattern",
-                "y_position": block.get("y_position", 0),
-                "font_size": round(block.get("size", 12), 1)
+                "y_position": y_position,
+                "font_size": size
             })
-    
-    return headings
-
-def detect_headings_by_structure_enhanced(text_blocks: List[Dict], structure_analysis: Dict, title: str) -> List[Dict]:
-    """Enhanced structure-based detection with more inclusive criteria."""
-    headings = []
-    significant_spacing = structure_analysis.get("significant_spacing", 15)
-    
-    for i, block in enumerate(text_blocks):
-        text = block["text"].strip()
-        
-        if text == title or is_page_number(text) or len(text) < 3:
-            continue
         
+        # Pass 3: Structure-based detection (more inclusive)
         confidence = 0
-        level = "H3"
         
         # Check for spacing before this block
         if i > 0:
-            prev_block = text_blocks[i-1]
-            spacing = block["y_position"] - prev_block["y_position"]
-            if spacing > significant_spacing * 0.8:  # More lenient spacing
+            prev_spacing = gaps[i - 1]
+            if prev_spacing > spacing_threshold:  # More lenient spacing
                 confidence += 0.3
         
         # Check for bold text
-        if block.get("any_bold", False):
+        if any_bold:
             confidence += 0.4
-            level = "H2"
         
         # Check for shorter lines (headings are often shorter)
-        if len(text) < 100 and len(text.split()) <= 15:
+        if text_len < 100 and word_count <= 15:
             confidence += 0.2
         
         # Check for isolation (lines with space before and after)
-        isolated = False
-        if i > 0 and i < len(text_blocks) - 1:
-            prev_spacing = block["y_position"] - text_blocks[i-1]["y_position"]
-            next_spacing = text_blocks[i+1]["y_position"] - block["y_position"]
+        if 0 < i < last_index:
+            next_spacing = gaps[i]
             if prev_spacing > 10 and next_spacing > 10:
-                isolated = True
                 confidence += 0.3
         
-        # Check for specific heading indicators (expanded list)
-        heading_keywords = [
-            'introduction', 'overview', 'conclusion', 'summary', 'background',
-            'methodology', 'results', 'discussion', 'abstract', 'contents',
-            'chapter', 'section', 'part', 'appendix', 'index', 'references',
-            'objectives', 'goals', 'purpose', 'scope', 'definition', 'problem',
-            'solution', 'analysis', 'findings', 'recommendations', 'future',
-            'related', 'work', 'literature', 'review', 'evaluation', 'implementation'
-        ]
-        
-        # Major headings should get higher confidence and be tagged for H1
-        major_headings = ['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents']
-        
-        if any(word in text.lower() for word in heading_keywords):
+        # Check for specific heading indicators; major headings get an
+        # extra boost
+        text_lower = block["text_lower"]
+        if STRUCTURE_KEYWORD_RE.search(text_lower):
             confidence += 0.3
-            if any(word in text.lower() for word in major_headings):
-                confidence += 0.4  # Extra boost for major headings
-                level = "H1"
-            else:
-                level = "H2"
+            if STRUCTURE_MAJOR_RE.search(text_lower):
+                confidence += 0.4
         
         # Check for centered text
         page_center = block.get("page_width", 612) / 2
@@ -503,83 +903,61 @@ def detect_headings_by_structure_enhanced(text_blocks: List[Dict], structure_ana
             confidence += 0.2
         
         if confidence > 0.5:  # Lower threshold
-            headings.append({
+            structure_headings.append({
                 "text": text,
                 "level": None,  # Let font size determine level
                 "page": block["page"],
                 "confidence": confidence,
                 "source": "structure",
-                "y_position": block.get("y_position", 0),
-                "font_size": round(block.get("size", 12), 1)
+                "y_position": y_position,
+                "font_size": size
             })
-    
-    return headings
-
-def detect_headings_by_heuristics(text_blocks: List[Dict], title: str, font_analysis: Dict) -> List[Dict]:
-    """Additional heuristic-based heading detection."""
-    headings = []
-    body_size = font_analysis.get("body_size", 12.0)
-    
-    for block in text_blocks:
-        text = block["text"].strip()
         
-        if (text == title or is_page_number(text) or 
-            len(text) < 3 or len(text) > 150):
+        # Pass 4: Heuristic-based detection for common heading characteristics
+        if text_len > 150:
             continue
         
         confidence = 0
-        level = "H3"
         
         # Short lines that are not body text
-        if (len(text) < 80 and 
-            len(text.split()) <= 10 and 
-            len(text.split()) >= 2):
+        if text_len < 80 and 2 <= word_count <= 10:
             confidence += 0.2
         
         # Lines with unusual capitalization
         if (text.count(' ') <= 8 and 
-            sum(1 for c in text if c.isupper()) / len(text) > 0.3):
+            sum(1 for c in text if c.isupper()) / text_len > 0.3):
             confidence += 0.3
         
         # Lines that start with common section words
-        section_starters = [
-            'part', 'chapter', 'section', 'subsection', 'topic', 'lesson',
-            'unit', 'module', 'step', 'phase', 'stage', 'level', 'grade'
-        ]
-        
-        first_word = text.split()[0].lower() if text.split() else ""
-        if first_word in section_starters:
+        if words and words[0].lower() in SECTION_STARTERS:
             confidence += 0.4
-            level = "H1"
         
         # Lines with special formatting patterns
-        if re.match(r'^[A-Z][A-Z\s]+[A-Z]$', text) and len(text.split()) <= 6:
+        if ALL_CAPS_LINE_RE.match(text) and word_count <= 6:
             confidence += 0.4
-            level = "H1"
         
         # Lines that look like table of contents entries
-        if re.match(r'^[A-Z].*\.\.\.*\d+$', text):
+        if TOC_ENTRY_RE.match(text):
             confidence += 0.6
-            level = "H2"
         
         # Bold or large text that's not body size
-        if (block.get("any_bold", False) and 
-            block["size"] >= body_size - 0.5 and
-            len(text.split()) <= 12):
+        if (any_bold and 
+            block["size"] >= near_body_size and
+            word_count <= 12):
             confidence += 0.3
         
         if confidence > 0.4:
-            headings.append({
+            heuristic_headings.append({
                 "text": text,
                 "level": None,  # Let font size determine level
                 "page": block["page"],
                 "confidence": confidence,
                 "source": "heuristic",
-                "y_position": block.get("y_position", 0),
-                "font_size": round(block.get("size", 12), 1)
+                "y_position": y_position,
+                "font_size": size
             })
     
-    return headings
+    return font_headings + pattern_headings + structure_headings + heuristic_headings
 
 def apply_heading_hierarchy_enhanced(headings: List[Dict], font_analysis: Dict) -> List[Dict]:
     """Enhanced hierarchy application with proper font-based level assignment."""
@@ -588,6 +966,7 @@ def apply_heading_hierarchy_enhanced(headings: List[Dict], font_analysis: Dict)
     
     # Get font size to level mapping
     size_to_level = font_analysis.get("size_to_level", {})
+    body_size = font_analysis.get("body_size", 12.0)
     
     # Apply hierarchy rules
     final_outline = []
@@ -598,28 +977,30 @@ def apply_heading_hierarchy_enhanced(headings: List[Dict], font_analysis: Dict)
         if len(clean_text) < 2 or len(clean_text) > 250:
             continue
         
+        # Lowercased once for all the keyword checks below
+        text_lower = clean_text.lower()
+        
         # Skip very common words and form field patterns that are unlikely to be headings
-        skip_words = ['page', 'copyright', '©', 'www', 'http', 'email', '@', 'version']
-        if any(word in clean_text.lower() for word in skip_words):
+        if HIERARCHY_SKIP_RE.search(text_lower):
             continue
         
         # Determine final level based on font size
         final_level = heading.get("level")
         
         # Check if this is a form field pattern and override to H3
-        is_form_field = (len(clean_text.split()) <= 8 and 
-            (clean_text.lower().startswith(('name of', 'date of', 'whether', 'if so', 'home town')) or
-             clean_text.lower().endswith(('servant', 'service', 'government', 'book', 'ltc', 'employed', 'temporary')) or
-             clean_text.lower() in ['designation', 'service', 'age', 'name', 'relationship', 's.no', 'date', 'rs.'] or
+        word_count = len(clean_text.split())
+        is_form_field = (word_count <= 8 and 
+            (text_lower.startswith(FORM_FIELD_PREFIXES) or
+             text_lower.endswith(FORM_FIELD_SUFFIXES) or
+             text_lower in FORM_FIELD_LABELS or
              '+' in clean_text or
-             re.match(r'^[A-Z\s]+\+[A-Z\s]+', clean_text) or
-             re.match(r'^\d+\.$', clean_text) or  # Just numbers like "10.", "11.", "12."
-             len(clean_text.split()) == 1 and len(clean_text) < 15))
+             PLUS_JOINED_RE.match(clean_text) or
+             NUMBER_ONLY_RE.match(clean_text) or  # Just numbers like "10.", "11.", "12."
+             word_count == 1 and len(clean_text) < 15))
         
         # If no level assigned or need to determine from font size
         if final_level is None:
             font_size = heading.get("font_size")
-            body_size = font_analysis.get("body_size", 12.0)
             
             if font_size and font_size in size_to_level:
                 final_level = size_to_level[font_size]
@@ -629,28 +1010,25 @@ def apply_heading_hierarchy_enhanced(headings: List[Dict], font_analysis: Dict)
                 source = heading.get("source", "")
                 
                 # Assign levels based on multiple factors, with special handling for common headings
-                text_lower = clean_text.lower()
-                
                 # Major document headings should be H1
-                if (text_lower in ['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents'] or
+                if (text_lower in MAJOR_HEADING_WORDS or
                     text_lower.startswith(('chapter ', 'section ', 'part ')) or
-                    re.match(r'^\d+\.?\s+(overview|introduction|conclusion|summary)', text_lower) or
+                    MAJOR_NUMBERED_RE.match(text_lower) or
                     (font_size and font_size > body_size + 1.5)):
                     final_level = "H1"
                 # Subsection headings
                 elif (confidence > 0.8 or 
                       source == "pattern" or 
                       (font_size and font_size > body_size + 0.3) or
-                      re.match(r'^\d+\.\d+', clean_text)):  # Numbered subsections like "2.1"
+                      SUBSECTION_NUMBER_RE.match(clean_text)):  # Numbered subsections like "2.1"
                     final_level = "H2"
                 else:
                     final_level = "H3"
         
         # Special handling for major document headings - these should always be H1
-        major_headings = ['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents', 'table of contents']
-        if (clean_text.lower() in major_headings or 
-            any(clean_text.lower().startswith(f'{word} ') for word in major_headings) or
-            re.match(r'^\d+\.?\s+(overview|introduction|conclusion|summary)', clean_text.lower())):
+        if (text_lower in MAJOR_HEADING_TITLES or 
+            text_lower.startswith(MAJOR_HEADING_PREFIXES) or
+            MAJOR_NUMBERED_RE.match(text_lower)):
             final_level = "H1"
         
         # Override form fields to H3 (but major headings take precedence)
@@ -664,7 +1042,7 @@ def apply_heading_hierarchy_enhanced(headings: List[Dict], font_analysis: Dict)
         })
     
     # Sort by page and then by position/order to maintain chronological order
-    final_outline.sort(key=lambda x: x["page"])
+    final_outline.sort(key=itemgetter("page"))
     
     return final_outline
 
@@ -690,9 +1068,9 @@ def extract_title_advanced(text_blocks: List[Dict]) -> str:
                       not is_header_footer(b, first_page_blocks)]
     
     # Strategy 2: Bold text in upper portion
-    upper_third = min(b["y_position"] for b in first_page_blocks) + \
-                 (max(b["y_position"] for b in first_page_blocks) - 
-                  min(b["y_position"] for b in first_page_blocks)) / 3
+    top_y = min(b["y_position"] for b in first_page_blocks)
+    bottom_y = max(b["y_position"] for b in first_page_blocks)
+    upper_third = top_y + (bottom_y - top_y) / 3
     
     bold_candidates = [b for b in first_page_blocks
                       if b["is_bold"] and 
@@ -707,43 +1085,34 @@ def extract_title_advanced(text_blocks: List[Dict]) -> str:
                           len(b["text"]) > 5 and
                           not is_page_number(b["text"])]
     
-    # Combine and score candidates
-    all_candidates = size_candidates + bold_candidates + centered_candidates
-    candidate_scores = {}
-    
-    for candidate in all_candidates:
-        text = candidate["text"]
-        score = 0
-        
-        # Size score
-        score += candidate["size"] * 2
-        
-        # Position score (higher for top of page)
-        position_score = (1 - candidate["y_position"] / candidate["page_height"]) * 10
-        score += position_score
-        
-        # Bold score
-        if candidate["is_bold"]:
-            score += 5
-        
-        # Length score (prefer moderate length)
-        length_score = min(len(text) / 10, 5)
-        score += length_score
-        
-        # Centering score
-        page_center = candidate["page_width"] / 2
-        text_center = candidate["x_position"] + (candidate["bbox"][2] - candidate["bbox"][0])/2
-        centering_score = max(0, 5 - abs(text_center - page_center) / 20)
-        score += centering_score
-        
-        # Pattern bonus
-        if re.match(r'^[A-Z][A-Za-z\s\-–:]+$', text):
-            score += 3
-        
-        candidate_scores[text] = score
-    
-    if candidate_scores:
-        best_title = max(candidate_scores, key=candidate_scores.get)
+    # Combine candidates; a text found by several strategies (or on several
+    # blocks) is scored from its last block but keeps its first position
+    candidates_by_text = {}
+    for candidate in size_candidates + bold_candidates + centered_candidates:
+        candidates_by_text[candidate["text"]] = candidate
+    
+    if candidates_by_text:
+        candidates = list(candidates_by_text.values())
+        count = len(candidates)
+        
+        def column(key):
+            return np.fromiter((c[key] for c in candidates), dtype=np.float64, count=count)
+        
+        # Score every candidate at once: size, position (higher for top of
+        # page), bold, length (prefer moderate length), centering and pattern
+        scores = column("size") * 2
+        scores += (1 - column("y_position") / column("page_height")) * 10
+        scores += np.fromiter((c["is_bold"] for c in candidates), dtype=bool, count=count) * 5
+        scores += np.minimum(
+            np.fromiter((len(text) for text in candidates_by_text), dtype=np.float64, count=count) / 10, 5)
+        text_center = column("x_position") + np.fromiter(
+            ((c["bbox"][2] - c["bbox"][0]) / 2 for c in candidates), dtype=np.float64, count=count)
+        scores += np.maximum(0, 5 - np.abs(text_center - column("page_width") / 2) / 20)
+        scores += np.fromiter((TITLE_LINE_RE.match(text) is not None for text in candidates_by_text),
+                              dtype=bool, count=count) * 3
+        
+        # argmax returns the first of equal scores, like max() over the texts
+        best_title = candidates[int(np.argmax(scores))]["text"]
         return clean_title_text(best_title)
     
     return ""
@@ -753,24 +1122,18 @@ def extract_outline_advanced(text_blocks: List[Dict], title: str) -> List[Dict]:
     if not text_blocks:
         return []
     
-    # Analyze document structure
-    font_analysis = analyze_font_hierarchy(text_blocks, title)
-    structure_analysis = analyze_document_structure(text_blocks)
-    
-    # Multi-pass heading detection
-    headings = []
-    
-    # Pass 1: Font-based detection
-    font_headings = detect_headings_by_font(text_blocks, font_analysis, title)
-    headings.extend(font_headings)
+    # Numeric columns and header/footer classification are shared by the
+    # analysis and detection passes
+    columns = block_columns(text_blocks)
+    margin_mask = header_footer_mask(text_blocks, columns)
     
-    # Pass 2: Pattern-based detection
-    pattern_headings = detect_headings_by_pattern(text_blocks, title)
-    headings.extend(pattern_headings)
+    # Analyze document structure
+    font_analysis = analyze_font_hierarchy(text_blocks, title, margin_mask, columns)
+    structure_analysis = analyze_document_structure(text_blocks, columns)
     
-    # Pass 3: Structure-based detection
-    structure_headings = detect_headings_by_structure(text_blocks, structure_analysis, title)
-    headings.extend(structure_headings)
+    # Font, pattern and structure detection in a single pass over the blocks
+    headings = detect_headings_fused(text_blocks, font_analysis, structure_analysis, title, margin_mask,
+                                     columns)
     
     # Merge and deduplicate
     merged_headings = merge_heading_candidates(headings)
@@ -780,28 +1143,37 @@ def extract_outline_advanced(text_blocks: List[Dict], title: str) -> List[Dict]:
     
     return final_outline
 
-def analyze_font_hierarchy(text_blocks: List[Dict], title: str) -> Dict:
-    """Analyze font sizes and establish hierarchy."""
+def analyze_font_hierarchy(text_blocks: List[Dict], title: str, margin_mask=None, columns=None) -> Dict:
+    """Analyze font sizes and establish hierarchy.
+    
+    margin_mask and columns, when given, are header_footer_mask(text_blocks)
+    and block_columns(text_blocks) computed by the caller.
+    """
+    if columns is None:
+        columns = block_columns(text_blocks)
+    if margin_mask is None:
+        margin_mask = header_footer_mask(text_blocks, columns)
+    
     # Exclude title and common non-heading text
-    content_blocks = [b for b in text_blocks 
-                     if b["text"] != title and 
-                     not is_page_number(b["text"]) and 
-                     not is_header_footer(b, text_blocks)]
+    content_mask = [b["text"] != title and 
+                    not in_margin and
+                    not page_number
+                    for b, in_margin, page_number in zip(text_blocks, margin_mask, columns["page_number"])]
     
-    if not content_blocks:
+    sizes = columns["size"][content_mask]
+    if not len(sizes):
         return {}
     
     # Analyze font size distribution
-    sizes = [b["size"] for b in content_blocks]
-    size_counter = Counter(round(s, 1) for s in sizes)
+    size_counter = size_histogram(size_buckets(sizes))
     
     # Find body text size (most common)
-    body_size = size_counter.most_common(1)[0][0]
+    body_size = max(size_counter, key=size_counter.get)
     
     # Find heading sizes (larger than body text and less frequent)
     heading_sizes = []
     for size, count in size_counter.items():
-        if size > body_size + 0.5 and count < len(content_blocks) * 0.3:
+        if size > body_size + 0.5 and count < len(sizes) * 0.3:
             heading_sizes.append(size)
     
     # Sort heading sizes (largest first)
@@ -821,160 +1193,172 @@ def analyze_font_hierarchy(text_blocks: List[Dict], title: str) -> Dict:
         "size_distribution": dict(size_counter)
     }
 
-def analyze_document_structure(text_blocks: List[Dict]) -> Dict:
-    """Analyze document structure and layout patterns."""
-    # Analyze spacing patterns
-    y_positions = [b["y_position"] for b in text_blocks]
-    spacing_gaps = []
+def analyze_document_structure(text_blocks: List[Dict], columns=None) -> Dict:
+    """Analyze document structure and layout patterns.
+    
+    columns, when given, is block_columns(text_blocks) computed by the caller.
+    """
     
-    for i in range(1, len(y_positions)):
-        gap = y_positions[i] - y_positions[i-1]
-        if gap > 0:
-            spacing_gaps.append(gap)
+    if columns is None:
+        columns = block_columns(text_blocks)
+    
+    # Analyze spacing patterns
+    gaps = np.diff(columns["y_position"])
+    spacing_gaps = gaps[gaps > 0].tolist()
     
-    # Find significant spacing (potential section breaks)
+    # Find significant spacing (potential section breaks); sum() over the
+    # list keeps the sequential float summation
     if spacing_gaps:
         avg_spacing = sum(spacing_gaps) / len(spacing_gaps)
         significant_spacing = avg_spacing * 1.5
     else:
+        avg_spacing = 15
         significant_spacing = 20
     
-    # Analyze indentation patterns
-    x_positions = [b["x_position"] for b in text_blocks]
-    common_indents = Counter(round(x, 0) for x in x_positions)
+    # Analyze indentation patterns; np.rint rounds half to even like round(x, 0)
+    x_positions = columns["x_position"]
+    indents, first_index, counts = np.unique(np.rint(x_positions), return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind="stable")
+    common_indents = dict(zip(indents[order].tolist(), counts[order].tolist()))
     
     return {
         "significant_spacing": significant_spacing,
-        "average_spacing": sum(spacing_gaps) / len(spacing_gaps) if spacing_gaps else 15,
-        "common_indents": dict(common_indents),
-        "left_margin": min(x_positions) if x_positions else 0
+        "average_spacing": avg_spacing,
+        "common_indents": common_indents,
+        "left_margin": x_positions.min().item() if len(x_positions) else 0
     }
 
-def detect_headings_by_font(text_blocks: List[Dict], font_analysis: Dict, title: str) -> List[Dict]:
-    """Detect headings based on font size analysis."""
-    headings = []
+def detect_headings_fused(text_blocks: List[Dict], font_analysis: Dict, structure_analysis: Dict,
+                          title: str, margin_mask=None, columns=None) -> List[Dict]:
+    """Font, pattern and structure heading detection in one pass.
+    
+    Each block is scored by all three methods while its text and word count
+    are at hand. Candidates are kept in per-method lists and concatenated in
+    method order, so merging sees them in the same order as three separate
+    passes would produce. margin_mask and columns are as for
+    analyze_font_hierarchy.
+    """
+    
+    if not text_blocks:
+        return []
+    if columns is None:
+        columns = block_columns(text_blocks)
+    if margin_mask is None:
+        margin_mask = header_footer_mask(text_blocks, columns)
+    
+    font_headings = []
+    pattern_headings = []
+    structure_headings = []
+    
     size_to_level = font_analysis.get("size_to_level", {})
+    significant_spacing = structure_analysis.get("significant_spacing", 20)
     
-    for block in text_blocks:
-        text = block["text"].strip()
-        size = round(block["size"], 1)
+    # round(size, 1) for every block at once
+    rounded_sizes = (size_buckets(columns["size"]) / 10).tolist()
+    
+    # The structure layout terms depend only on numbers, so score them for
+    # every block at once: spacing before the block, then bold text
+    spaced = np.zeros(len(text_blocks), dtype=bool)
+    spaced[1:] = np.diff(columns["y_position"]) > significant_spacing
+    bold = columns["is_bold"]
+    layout_confidence = (spaced * 0.3 + bold * 0.4).tolist()
+    
+    for block, in_margin, size, page_number, layout_score, is_bold in zip(
+            text_blocks, margin_mask, rounded_sizes, columns["page_number"],
+            layout_confidence, bold.tolist()):
+        text = block["text"]
         
-        if (text != title and 
-            size in size_to_level and 
-            not is_page_number(text) and
-            not is_header_footer(block, text_blocks) and
+        if text == title or page_number:
+            continue
+        
+        text_len = len(text)
+        word_count = len(text.split())
+        
+        # Pass 1: Font-based detection
+        if (size in size_to_level and 
+            not in_margin and
             is_heading_like_text(text)):
             
-            headings.append({
+            font_headings.append({
                 "text": text,
                 "level": size_to_level[size],
                 "page": block["page"],
                 "confidence": calculate_font_confidence(block, font_analysis),
                 "source": "font"
             })
-    
-    return headings
-
-def detect_headings_by_pattern(text_blocks: List[Dict], title: str) -> List[Dict]:
-    """Detect headings based on text patterns."""
-    headings = []
-    
-    for block in text_blocks:
-        text = block["text"].strip()
-        
-        if text == title or is_page_number(text):
-            continue
         
+        # Pass 2: Pattern-based detection
         confidence = 0
         level = "H1"
         
+        # Each pattern needs a particular first character, so only the
+        # patterns that can match are tried
+        first = text[:1]
+        digit_first = first.isdecimal()
+        ascii_upper_first = 'A' <= first <= 'Z'
+        
         # Numbered headings (1., 1.1, etc.)
-        if re.match(r'^\d+\.\s+[A-Z]', text):
+        if digit_first and NUMBERED_H1_RE.match(text):
             confidence = 0.9
             level = "H1"
-        elif re.match(r'^\d+\.\d+\s+[A-Z]', text):
+        elif digit_first and NUMBERED_H2_RE.match(text):
             confidence = 0.9
             level = "H2"
-        elif re.match(r'^\d+\.\d+\.\d+\s+[A-Z]', text):
+        elif digit_first and NUMBERED_H3_RE.match(text):
             confidence = 0.9
             level = "H3"
         
         # Roman numerals
-        elif re.match(r'^[IVX]+\.\s+[A-Z]', text):
+        elif first in ('I', 'V', 'X') and ROMAN_HEADING_RE.match(text):
             confidence = 0.8
             level = "H1"
         
         # Lettered headings (A., B., etc.)
-        elif re.match(r'^[A-Z]\.\s+[A-Z]', text):
+        elif ascii_upper_first and LETTERED_HEADING_RE.match(text):
             confidence = 0.7
             level = "H2"
         
         # All caps headings
-        elif text.isupper() and len(text.split()) <= 8 and len(text) > 3:
+        elif text.isupper() and word_count <= 8 and text_len > 3:
             confidence = 0.6
             level = "H1"
         
         # Title case with specific patterns
-        elif (re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$', text) and 
-              len(text.split()) <= 8 and 
-              len(text) > 5):
+        elif (ascii_upper_first and TITLE_CASE_RE.match(text) and 
+              word_count <= 8 and 
+              text_len > 5):
             confidence = 0.5
             level = "H2"
         
         if confidence > 0.5:
-            headings.append({
+            pattern_headings.append({
                 "text": text,
                 "level": level,
                 "page": block["page"],
                 "confidence": confidence,
                 "source": "pattern"
             })
-    
-    return headings
-
-def detect_headings_by_structure(text_blocks: List[Dict], structure_analysis: Dict, title: str) -> List[Dict]:
-    """Detect headings based on document structure and layout."""
-    headings = []
-    significant_spacing = structure_analysis.get("significant_spacing", 20)
-    
-    for i, block in enumerate(text_blocks):
-        text = block["text"].strip()
         
-        if text == title or is_page_number(text):
-            continue
-        
-        confidence = 0
-        
-        # Check for spacing before this block
-        if i > 0:
-            prev_block = text_blocks[i-1]
-            spacing = block["y_position"] - prev_block["y_position"]
-            if spacing > significant_spacing:
-                confidence += 0.3
-        
-        # Check for bold text
-        if block.get("is_bold", False):
-            confidence += 0.4
+        # Pass 3: Structure-based detection, starting from the layout score
+        confidence = layout_score
         
         # Check for shorter lines (headings are often shorter)
-        if len(text) < 80 and len(text.split()) <= 10:
+        if text_len < 80 and word_count <= 10:
             confidence += 0.2
         
         # Check for specific heading indicators
-        if any(word in text.lower() for word in 
-               ['introduction', 'overview', 'conclusion', 'summary', 'background',
-                'methodology', 'results', 'discussion', 'abstract', 'contents']):
+        if STRUCTURE_INDICATOR_RE.search(block["text_lower"]):
             confidence += 0.3
         
         if confidence > 0.6:
             # Determine level based on position and formatting
             level = "H2"
-            if block.get("is_bold", False) and confidence > 0.8:
+            if is_bold and confidence > 0.8:
                 level = "H1"
             elif confidence < 0.8:
                 level = "H3"
             
-            headings.append({
+            structure_headings.append({
                 "text": text,
                 "level": level,
                 "page": block["page"],
@@ -982,30 +1366,35 @@ def detect_headings_by_structure(text_blocks: List[Dict], structure_analysis: Di
                 "source": "structure"
             })
     
-    return headings
+    return font_headings + pattern_headings + structure_headings
 
 def merge_heading_candidates(headings: List[Dict]) -> List[Dict]:
     """Merge and deduplicate heading candidates from different detection methods."""
-    # Group by text and page
-    heading_groups = defaultdict(list)
+    # Group by text and page in first-occurrence order, keeping only what
+    # the merge needs per group: the first font candidate, the first
+    # candidate with the highest confidence, and the candidate count
+    heading_groups = {}
     for heading in headings:
         key = (heading["text"], heading["page"])
-        heading_groups[key].append(heading)
+        group = heading_groups.get(key)
+        if group is None:
+            heading_groups[key] = [heading if heading["source"] == "font" else None, heading, 1]
+        else:
+            if group[0] is None and heading["source"] == "font":
+                group[0] = heading
+            if heading["confidence"] > group[1]["confidence"]:
+                group[1] = heading
+            group[2] += 1
     
     merged = []
-    for (text, page), candidates in heading_groups.items():
-        # Prioritize font-based detection for level assignment
-        font_candidate = next((c for c in candidates if c["source"] == "font"), None)
-        
-        if font_candidate:
-            best = font_candidate
-        else:
-            # Find best candidate (highest confidence)
-            best = max(candidates, key=lambda x: x["confidence"])
+    for font_candidate, top_candidate, count in heading_groups.values():
+        # Prioritize font-based detection for level assignment, otherwise
+        # take the best candidate (highest confidence)
+        best = font_candidate if font_candidate is not None else top_candidate
         
         # Boost confidence if multiple methods agree
-        if len(candidates) > 1:
-            best["confidence"] = min(1.0, best["confidence"] + 0.2 * (len(candidates) - 1))
+        if count > 1:
+            best["confidence"] = min(1.0, best["confidence"] + 0.2 * (count - 1))
         
         merged.append(best)
     
@@ -1052,6 +1441,7 @@ def calculate_font_confidence(block: Dict, font_analysis: Dict) -> float:
     
     return min(1.0, confidence)
 
+@functools.lru_cache(maxsize=8192)
 def is_heading_like_text(text: str) -> bool:
     """Enhanced check if text looks like a heading."""
     text = text.strip()
@@ -1065,30 +1455,29 @@ def is_heading_like_text(text: str) -> bool:
     if word_count > 15:
         return False
     
-    # Pattern checks
-    if re.match(r'^\d+[\.\s]', text):  # Numbered
+    # Pattern checks; each needs a particular first character
+    first = text[0]
+    if first.isdecimal() and NUMBERED_PREFIX_RE.match(text):  # Numbered
         return True
     
-    if re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$', text):  # Title case
+    if 'A' <= first <= 'Z' and TITLE_CASE_RE.match(text):  # Title case
         return True
     
     if text.isupper() and word_count <= 8:  # All caps
         return True
     
     # Common heading words
-    heading_indicators = [
-        'introduction', 'overview', 'background', 'methodology', 'results',
-        'conclusion', 'discussion', 'summary', 'abstract', 'contents',
-        'chapter', 'section', 'part', 'appendix', 'index', 'references'
-    ]
-    
-    if any(word in text.lower() for word in heading_indicators):
+    if HEADING_INDICATOR_RE.search(text.lower()):
         return True
     
     return False
 
 def is_header_footer(block: Dict, all_blocks: List[Dict]) -> bool:
-    """Check if block is likely a header or footer."""
+    """Check if block is likely a header or footer.
+    
+    Only the block's own position is used; all_blocks is accepted for API
+    compatibility. Use header_footer_mask to classify many blocks at once.
+    """
     page_height = block.get("page_height", 1000)
     y_pos = block["y_position"]
     
@@ -1102,26 +1491,91 @@ def is_header_footer(block: Dict, all_blocks: List[Dict]) -> bool:
     
     return False
 
+def block_columns(blocks: List[Dict]) -> Dict:
+    """The numeric block fields used by the layout analyses, as numpy columns.
+    
+    Built once per document so the analyses work on contiguous arrays
+    instead of looking the same fields up in every block dict. "page_number"
+    is is_page_number for every block, as a list of bools, since each
+    analysis and detection pass skips those blocks.
+    """
+    count = len(blocks)
+    return {
+        "size": np.fromiter((b["size"] for b in blocks), dtype=np.float64, count=count),
+        "x_position": np.fromiter((b["x_position"] for b in blocks), dtype=np.float64, count=count),
+        "y_position": np.fromiter((b["y_position"] for b in blocks), dtype=np.float64, count=count),
+        "page_height": np.fromiter((b.get("page_height", 1000) for b in blocks), dtype=np.float64, count=count),
+        "is_bold": np.fromiter((b.get("is_bold", False) for b in blocks), dtype=bool, count=count),
+        "page_number": [is_page_number(b["text"]) for b in blocks],
+    }
+
+def size_buckets(sizes):
+    """round(size, 1) * 10 for every size at once, as an int64 array.
+    
+    bucket / 10 is the same float round(size, 1) returns.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    scaled = sizes * 10
+    buckets = np.rint(scaled)
+    # round() works on the exact decimal value, which scaling can push across
+    # a half (10.05 * 10 == 100.5), so let it settle near-ties itself
+    near_tie = np.flatnonzero(np.abs(np.abs(scaled - buckets) - 0.5) < 1e-6)
+    for i in near_tie.tolist():
+        buckets[i] = round(round(sizes[i].item(), 1) * 10)
+    return buckets.astype(np.int64)
+
+def size_histogram(buckets) -> Dict:
+    """Count size_buckets() output, keyed by round(size, 1).
+    
+    Keys are in first-occurrence order, so ties resolve like a Counter built
+    by iterating the sizes.
+    """
+    unique_buckets, first_index, counts = np.unique(buckets, return_index=True, return_counts=True)
+    order = np.argsort(first_index, kind="stable")
+    return {bucket / 10: count
+            for bucket, count in zip(unique_buckets[order].tolist(), counts[order].tolist())}
+
+def header_footer_mask(blocks: List[Dict], columns: Optional[Dict] = None) -> List[bool]:
+    """is_header_footer for every block at once, as a list of bools.
+    
+    columns, when given, is block_columns(blocks) computed by the caller.
+    """
+    if columns is None:
+        columns = block_columns(blocks)
+    y_pos = columns["y_position"]
+    page_height = columns["page_height"]
+    return ((y_pos < page_height * 0.1) | (y_pos > page_height * 0.9)).tolist()
+
 def clean_title_text(text: str) -> str:
     """Clean and normalize title text."""
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = WHITESPACE_RUN_RE.sub(' ', text.strip())
     
     # Remove trailing punctuation except for appropriate cases
-    text = re.sub(r'[\.]+$', '', text)
+    text = TRAILING_DOTS_RE.sub('', text)
     
     return text
 
+@functools.lru_cache(maxsize=8192)
 def is_page_number(text):
-    """Check if text is likely a page number."""
+    """Check if text is likely a page number.
+    
+    Memoized: the detection passes each ask about the same block texts.
+    """
     text = text.strip()
     if text.isdigit() and len(text) <= 3:
         return True
-    if re.match(r'^(page\s*)?\d+$', text.lower()):
-        return True
-    if re.match(r'^\d+\s*$', text):
-        return True
-    return False
+    return page_number_match(text)
+
+def page_number_match(text):
+    """PAGE_NUMBER_RE against stripped text, regex-free unless it may start "page".
+    
+    Text starting with anything but "p" can only match as a bare run of
+    decimal digits, which is exactly what str.isdecimal tests.
+    """
+    if text[:1] in ('p', 'P'):
+        return PAGE_NUMBER_RE.match(text.lower()) is not None
+    return text.isdecimal()
 
 def is_likely_heading(text, block):
     """Determine if text is likely a heading based on various heuristics."""
@@ -1131,41 +1585,36 @@ def is_likely_heading(text, block):
     if len(text) < 3 or len(text) > 200:
         return False
     
+    # The numbered patterns below need a leading digit, the title case one
+    # a leading capital
+    digit_first = text[0].isdecimal()
+    
     # Contains mostly numbers (likely page numbers or references)
-    if re.match(r'^\d+(\.\d+)*$', text):
+    if digit_first and SECTION_NUMBER_ONLY_RE.match(text):
         return False
     
     # Skip common non-heading content
-    skip_words = ['page', 'copyright', '©', 'version', 'date', 'isbn']
-    if any(word in text.lower() for word in skip_words):
+    text_lower = text.lower()
+    if LIKELY_HEADING_SKIP_RE.search(text_lower):
         return False
     
     # Common heading patterns
-    if re.match(r'^\d+\.?\s+', text):  # "1. Introduction" or "1 Introduction"
+    if digit_first and NUMBERED_LINE_RE.match(text):  # "1. Introduction" or "1 Introduction"
         return True
     
-    if re.match(r'^\d+\.\d+\s+', text):  # "2.1 Something"
+    if digit_first and SUBSECTION_LINE_RE.match(text):  # "2.1 Something"
         return True
     
     # Title case pattern
-    if re.match(r'^[A-Z][A-Za-z\s\-–]+$', text) and len(text.split()) <= 10:
+    if 'A' <= text[0] <= 'Z' and CAPITALIZED_LINE_RE.match(text) and len(text.split(None, 10)) <= 10:
         return True
     
     # Check if it's bold (flags & 16 = bold)
-    if block["flags"] & 16 and len(text.split()) <= 10:
+    if block["flags"] & 16 and len(text.split(None, 10)) <= 10:
         return True
     
     # Common heading words
-    heading_words = ['introduction', 'overview', 'background', 'methodology', 'results', 
-                    'conclusion', 'discussion', 'summary', 'abstract', 'acknowledgment',
-                    'references', 'bibliography', 'appendix', 'contents', 'index', 'revision',
-                    'history', 'table', 'business', 'outcomes', 'content', 'trademarks',
-                    'documents', 'web', 'sites', 'audience', 'career', 'paths', 'learning',
-                    'objectives', 'entry', 'requirements', 'structure', 'course', 'duration',
-                    'keeping', 'current', 'syllabus', 'agile', 'tester', 'extension', 'foundation',
-                    'level']
-    
-    if any(word in text.lower() for word in heading_words):
+    if LIKELY_HEADING_RE.search(text_lower):
         return True
     
     return False
@@ -1178,6 +1627,79 @@ def clean_heading_text(text):
     # Don't remove leading numbers for numbered headings - keep them as they appear
     return text
 
+def list_pdf_files(input_dir):
+    """List the PDFs in input_dir, largest first.
+    
+    A single scandir pass reuses the directory entries' cached type info, and
+    scheduling big files first balances the worker pool (longest job first).
+    """
+    entries = [
+        entry for entry in os.scandir(input_dir)
+        if entry.is_file(follow_symlinks=False) and entry.name.lower().endswith(".pdf")
+    ]
+    entries.sort(key=lambda entry: entry.stat().st_size, reverse=True)
+    return [Path(entry.path) for entry in entries]
+
+def encode_output_json(data):
+    """Encode data the way every output file is written: indent=2, compact separators, UTF-8."""
+    return json.dumps(data, indent=2, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+# Output for PDFs that could not be processed, encoded once up front
+EMPTY_OUTPUT_JSON = encode_output_json({"title": "", "outline": []})
+
+def truncate_text(text, limit):
+    """Shorten text for console output, marking cuts with a single ellipsis."""
+    return text if len(text) <= limit else f"{text[:limit]}…"
+
+def write_json(output_file, data):
+    """Write data as indented UTF-8 JSON in the format of sample_dataset/outputs.
+    
+    The document is encoded in memory and written with a single call;
+    json.dump would issue a write per token.
+    """
+    Path(output_file).write_bytes(encode_output_json(data))
+
+def pool_size(task_count):
+    """Worker processes to start for task_count independent PDFs.
+    
+    Never more than the CPU count, and never more than there are files, since
+    every worker preloads the multilingual model whether it gets work or not.
+    """
+    return max(1, min(os.cpu_count() or 1, task_count))
+
+def process_pdf_file(pdf_file, output_dir):
+    """Extract one PDF and write its JSON outline (runs in a worker process)."""
+    import time
+    file_start_time = time.time()
+    output_file = output_dir / f"{pdf_file.stem}.json"
+    try:
+        # Extract title and outline with maximum accuracy
+        title, outline = extract_title_and_outline(pdf_file)
+        
+        # Create output data
+        output_data = {
+            "title": title,
+            "outline": outline
+        }
+        
+        # Create output JSON file with minimal indentation for size optimization
+        write_json(output_file, output_data)
+        
+        return {
+            "file": pdf_file.name,
+            "output": output_file.name,
+            "title": title,
+            "heading_count": len(outline),
+            "time": time.time() - file_start_time,
+            "error": None
+        }
+        
+    except Exception as e:
+        # Create empty output for failed files
+        output_file.write_bytes(EMPTY_OUTPUT_JSON)
+        
+        return {"file": pdf_file.name, "error": str(e)}
+
 def process_pdfs():
     """Process all PDFs in input directory and generate JSON outlines with optimized performance."""
     import time
@@ -1195,7 +1717,7 @@ def process_pdfs():
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Get all PDF files
-    pdf_files = list(input_dir.glob("*.pdf"))
+    pdf_files = list_pdf_files(input_dir)
     
     if not pdf_files:
         print("No PDF files found in input directory")
@@ -1206,43 +1728,23 @@ def process_pdfs():
     successful_count = 0
     total_headings = 0
     
-    for pdf_file in pdf_files:
-        file_start_time = time.time()
-        try:
-            print(f"Processing {pdf_file.name}...")
-            
-            # Extract title and outline with maximum accuracy
-            title, outline = extract_title_and_outline(pdf_file)
-            
-            # Create output data
-            output_data = {
-                "title": title,
-                "outline": outline
-            }
-            
-            # Create output JSON file with minimal indentation for size optimization
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=2, ensure_ascii=False, separators=(',', ':'))
+    # Each PDF is independent; extract them in parallel worker processes
+    with ProcessPoolExecutor(max_workers=pool_size(len(pdf_files)),
+                             initializer=preload_multilingual_detector) as executor:
+        results = executor.map(process_pdf_file, pdf_files, repeat(output_dir), chunksize=1)
+        
+        for result in results:
+            if result["error"] is not None:
+                print(f"Error processing {result['file']}: {result['error']}")
+                continue
             
-            file_time = time.time() - file_start_time
             successful_count += 1
-            total_headings += len(outline)
-            
-            print(f"Completed {pdf_file.name} -> {output_file.name} "
-                  f"(Title: '{title[:50]}{'...' if len(title) > 50 else ''}', "
-                  f"{len(outline)} headings, {file_time:.2f}s)")
+            total_headings += result["heading_count"]
+            title = result["title"]
             
-        except Exception as e:
-            print(f"Error processing {pdf_file.name}: {str(e)}")
-            # Create empty output for failed files
-            output_data = {
-                "title": "",
-                "outline": []
-            }
-            output_file = output_dir / f"{pdf_file.stem}.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(output_data, f, indent=2, separators=(',', ':'))
+            print(f"Completed {result['file']} -> {result['output']} "
+                  f"(Title: '{truncate_text(title, 50)}', "
+                  f"{result['heading_count']} headings, {result['time']:.2f}s)")
     
     total_time = time.time() - start_time
     print(f"\nProcessing Summary:")
@@ -1253,6 +1755,7 @@ def process_pdfs():
 
 def extract_title_and_outline_optimized(pdf_path):
     """Optimized version of title and outline extraction for performance."""
+    import fitz  # PyMuPDF
     doc = fitz.open(pdf_path)
     
     try:
@@ -1308,14 +1811,16 @@ def extract_pdf_outline_fast(doc):
     
     return {"title": title, "outline": outline}
 
-def extract_text_blocks_optimized(doc, max_pages):
+def extract_text_blocks_optimized(doc, max_pages, page_cache=None):
     """Optimized text extraction with limited scope."""
     text_blocks = []
     
     for page_num in range(max_pages):
-        page = doc[page_num]
-        page_dict = page.get_text("dict")
-        page_rect = page.rect
+        page_dict, page_rect = get_page_dict(doc, page_num, page_cache)
+        # Page-level fields are the same for every line on the page
+        page_no = page_num + 1
+        page_width = page_rect.width
+        page_height = page_rect.height
         
         block_count = 0
         for block in page_dict["blocks"]:
@@ -1324,36 +1829,45 @@ def extract_text_blocks_optimized(doc, max_pages):
             
             if "lines" in block:
                 for line in block["lines"]:
-                    line_text_parts = []
-                    line_bbox = line["bbox"]
+                    spans = line["spans"]
+                    if not spans:
+                        continue
                     
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if text:
-                            line_text_parts.append(text)
+                    if len(spans) == 1:
+                        # Most lines are a single span: no joining needed
+                        full_line_text = spans[0]["text"].strip()
+                    else:
+                        # Parts are stripped and non-empty, so the join is too
+                        full_line_text = " ".join(
+                            text for text in (span["text"].strip() for span in spans) if text
+                        )
                     
-                    if line_text_parts:
-                        full_line_text = " ".join(line_text_parts).strip()
-                        if full_line_text and len(full_line_text) > 2:
-                            first_span = line["spans"][0]
-                            
-                            text_blocks.append({
-                                "text": full_line_text[:200],  # Limit text length
-                                "page": page_num + 1,
-                                "size": first_span["size"],
-                                "flags": first_span["flags"],
-                                "bbox": line_bbox,
-                                "x_position": line_bbox[0],
-                                "y_position": line_bbox[1],
-                                "page_width": page_rect.width,
-                                "page_height": page_rect.height,
-                                "is_bold": bool(first_span["flags"] & 16),
-                                "word_count": len(full_line_text.split())
-                            })
-                            
-                            block_count += 1
-                            if len(text_blocks) > 500:  # Global limit for performance
-                                return text_blocks
+                    if len(full_line_text) > 2:
+                        line_bbox = line["bbox"]
+                        first_span = spans[0]
+                        flags = first_span["flags"]
+                        
+                        # Limit text length; the cut may end on a space
+                        text = full_line_text[:200].rstrip()
+                        
+                        text_blocks.append({
+                            "text": text,
+                            "text_lower": text.lower(),
+                            "page": page_no,
+                            "size": first_span["size"],
+                            "flags": flags,
+                            "bbox": line_bbox,
+                            "x_position": line_bbox[0],
+                            "y_position": line_bbox[1],
+                            "page_width": page_width,
+                            "page_height": page_height,
+                            "is_bold": (flags & 16) != 0,
+                            "word_count": len(full_line_text.split())
+                        })
+                        
+                        block_count += 1
+                        if len(text_blocks) > 500:  # Global limit for performance
+                            return text_blocks
     
     return text_blocks
 
@@ -1366,8 +1880,9 @@ def extract_title_fast(text_blocks: List[Dict]) -> str:
     if not first_page_blocks:
         return ""
     
-    # Simple largest font + position strategy
-    scored_candidates = []
+    # Simple largest font + position strategy; the best candidate is tracked
+    # while scoring, keeping the first of equal scores
+    best_score = best_title = None
     max_size = max(b["size"] for b in first_page_blocks)
     
     for block in first_page_blocks:
@@ -1382,10 +1897,11 @@ def extract_title_fast(text_blocks: List[Dict]) -> str:
             if block["is_bold"]:
                 score += 5
             
-            scored_candidates.append((score, block["text"]))
+            if best_score is None or score > best_score:
+                best_score = score
+                best_title = block["text"]
     
-    if scored_candidates:
-        best_title = max(scored_candidates, key=lambda x: x[0])[1]
+    if best_title is not None:
         return best_title.strip()[:150]  # Limit length
     
     return ""
@@ -1400,14 +1916,15 @@ def extract_outline_fast(text_blocks: List[Dict], title: str) -> List[Dict]:
     if not sizes:
         return []
     
-    size_counts = Counter(round(s, 1) for s in sizes)
-    body_size = size_counts.most_common(1)[0][0]
+    size_counts = size_histogram(size_buckets(sizes))
+    body_size = max(size_counts, key=size_counts.get)
     
-    # Find heading candidates
+    # Find heading candidates as (level, text, page); output dicts are only
+    # built for the ones that survive deduplication
     headings = []
     
     for block in text_blocks:
-        text = block["text"].strip()
+        text = block["text"]
         
         if (text != title and 
             not is_page_number_fast(text) and
@@ -1428,40 +1945,41 @@ def extract_outline_fast(text_blocks: List[Dict], title: str) -> List[Dict]:
             if block["is_bold"]:
                 confidence += 0.3
             
-            # Pattern checks (simplified)
-            if re.match(r'^\d+\.?\s+[A-Z]', text):
+            # Pattern checks (simplified); numbered patterns need a leading digit
+            digit_first = text[:1].isdecimal()
+            if digit_first and NUMBERED_HEADING_RE.match(text):
                 confidence += 0.4
                 level = "H1"
-            elif re.match(r'^\d+\.\d+\s+[A-Z]', text):
+            elif digit_first and NUMBERED_H2_RE.match(text):
                 confidence += 0.4
                 level = "H2"
-            elif text.isupper() and len(text.split()) <= 6:
+            elif text.isupper() and len(text.split(None, 6)) <= 6:
                 confidence += 0.3
             
             # Common heading words
-            if any(word in text.lower() for word in 
-                   ['introduction', 'overview', 'conclusion', 'summary', 'background',
-                    'methodology', 'results', 'discussion', 'abstract']):
+            if FAST_HEADING_RE.search(block["text_lower"]):
                 confidence += 0.2
             
             if confidence > 0.6:
-                headings.append({
-                    "level": level,
-                    "text": text,
-                    "page": block["page"]
-                })
-    
-    # Remove duplicates and limit count
-    seen = set()
-    unique_headings = []
-    for heading in headings[:100]:  # Limit for performance
-        key = (heading["text"], heading["page"])
-        if key not in seen:
-            seen.add(key)
-            unique_headings.append(heading)
+                headings.append((level, text, block["page"]))
+                # Only the first 100 candidates are kept, so stop scoring
+                # once they are found
+                if len(headings) == 100:  # Limit for performance
+                    break
+    
+    # Remove duplicates; dicts keep insertion order, so the first occurrence
+    # of each key wins
+    unique = {}
+    for level, text, page in headings:
+        unique.setdefault((text, page), level)
+    unique_headings = [
+        {"level": level, "text": text, "page": page}
+        for (text, page), level in unique.items()
+    ]
     
     return unique_headings
 
+@functools.lru_cache(maxsize=8192)
 def is_page_number_fast(text: str) -> bool:
     """Fast page number detection."""
     text = text.strip()
@@ -1469,14 +1987,14 @@ def is_page_number_fast(text: str) -> bool:
         return False
     if text.isdigit() and len(text) <= 3:
         return True
-    return bool(re.match(r'^(page\s*)?\d+$', text.lower()))
+    return page_number_match(text)
 
 def detect_quick_patterns(text_blocks: List[Dict]) -> List[Dict]:
     """Ultra-fast pattern detection to determine if we should use fast or comprehensive analysis."""
     quick_headings = []
     
     for block in text_blocks[:50]:  # Only check first 50 blocks for speed
-        text = block["text"].strip()
+        text = block["text"]
         
         if (len(text) > 3 and len(text) < 100 and 
             not is_page_number_fast(text) and
@@ -1484,16 +2002,18 @@ def detect_quick_patterns(text_blocks: List[Dict]) -> List[Dict]:
             
             confidence = 0
             
-            # Quick pattern checks (most obvious heading patterns)
-            if re.match(r'^\d+\.?\s+[A-Z]', text):  # "1. Introduction"
+            # Quick pattern checks (most obvious heading patterns); numbered
+            # patterns need a leading digit
+            digit_first = text[:1].isdecimal()
+            if digit_first and NUMBERED_HEADING_RE.match(text):  # "1. Introduction"
                 confidence = 0.9
-            elif re.match(r'^\d+\.\d+\s+[A-Z]', text):  # "2.1 Something"
+            elif digit_first and NUMBERED_H2_RE.match(text):  # "2.1 Something"
                 confidence = 0.8
-            elif text.isupper() and len(text.split()) <= 6:  # All caps
+            elif text.isupper() and len(text.split(None, 6)) <= 6:  # All caps
                 confidence = 0.7
             elif block.get("is_bold", False) and block.get("size", 12) > 12:  # Bold + larger
                 confidence = 0.6
-            elif any(word in text.lower() for word in ['overview', 'introduction', 'summary']):
+            elif QUICK_HEADING_RE.search(block["text_lower"]):
                 confidence = 0.7
             
             if confidence > 0.6:
@@ -1519,105 +2039,107 @@ def extract_outline_fast_enhanced(text_blocks: List[Dict], title: str) -> List[D
     if not content_blocks:
         return []
     
-    # Simplified font hierarchy analysis
-    sizes = [b["size"] for b in content_blocks]
-    size_counter = Counter(round(s, 1) for s in sizes)
-    body_size = size_counter.most_common(1)[0][0] if size_counter else 12.0
     
-    # Find heading sizes efficiently
+    # Simplified font hierarchy analysis on 0.1pt buckets
+    buckets = size_buckets([b["size"] for b in content_blocks])
+    rounded_sizes = buckets / 10
+    size_counter = size_histogram(buckets)
+    body_size = max(size_counter, key=size_counter.get)
+    
+    # Find heading sizes efficiently; bold_sizes holds every size used by
+    # at least one bold block
+    bold = np.array([b.get("is_bold", False) for b in content_blocks], dtype=bool)
+    bold_sizes = set((buckets[bold] / 10).tolist())
     heading_sizes = [size for size, count in size_counter.items() 
                     if size > body_size + 0.3 or 
-                    (size >= body_size - 1.0 and 
-                     any(b.get("is_bold", False) for b in content_blocks if round(b["size"], 1) == size))]
+                    (size >= body_size - 1.0 and size in bold_sizes)]
     
-    # Sort sizes for hierarchy (largest = H1, smallest = H3)
-    heading_sizes_sorted = sorted(list(set(heading_sizes)), reverse=True)
-    size_to_level = {}
+    # Sort sizes for hierarchy (largest = H1, smallest = H3); they are
+    # histogram keys, so already distinct
+    heading_sizes.sort(reverse=True)
+    # Levels are tracked as 1-3 while scoring and named only for the output
     level_names = ["H1", "H2", "H3"]
     
-    for i, size in enumerate(heading_sizes_sorted[:3]):
-        size_to_level[size] = level_names[i]
+    # Font-based and bold scores depend only on size and weight, so they are
+    # computed for all blocks at once; the text checks below build on them
+    font_level = np.where(rounded_sizes > body_size + 1.5, 2, 3)
+    font_confidence = np.where(rounded_sizes > body_size + 0.5, 0.4, 0.0)
+    for i, size in enumerate(heading_sizes[:3]):
+        is_level = rounded_sizes == size
+        font_level[is_level] = i + 1
+        font_confidence[is_level] = 0.6
+    font_confidence[bold] += 0.4
+    font_level[bold] = np.minimum(font_level[bold], 2)
     
-    # Fast heading detection with multiple passes
-    headings = []
+    # Fast heading detection with multiple passes; candidates are keyed on
+    # (text, page) so repeats are dropped as they are found and only the first
+    # occurrence of each is cleaned and kept (dicts keep insertion order)
+    unique = {}
     
-    for block in content_blocks:
-        text = block["text"].strip()
+    for block, level, confidence in zip(content_blocks, font_level.tolist(),
+                                        font_confidence.tolist()):
+        text = block["text"]
         
         if (len(text) > 3 and len(text) < 200 and
             block.get("word_count", 1) <= 20):
             
-            confidence = 0
-            level = "H3"
-            size = round(block["size"], 1)
+            # Lowercase form and word-count limit are shared by the checks
+            # below; splitting stops once the limit is exceeded
+            text_lower = block["text_lower"]
+            few_words = len(text.split(None, 8)) <= 8
             
-            # Font-based detection
-            if size in size_to_level:
-                confidence += 0.6
-                level = size_to_level[size]
-            elif size > body_size + 0.5:
-                confidence += 0.4
-                level = "H2" if size > body_size + 1.5 else "H3"
-            
-            # Bold detection
-            if block.get("is_bold", False):
-                confidence += 0.4
-                if level == "H3":
-                    level = "H2"
-            
-            # Pattern detection (fast)
-            if re.match(r'^\d+\.?\s+[A-Z]', text):
+            # Pattern detection (fast); numbered patterns need a leading digit
+            digit_first = text[:1].isdecimal()
+            if digit_first and NUMBERED_HEADING_RE.match(text):
                 confidence += 0.5
-                level = "H1"
-            elif re.match(r'^\d+\.\d+\s+[A-Z]', text):
+                level = 1
+            elif digit_first and NUMBERED_H2_RE.match(text):
                 confidence += 0.5
-                level = "H2"
-            elif text.isupper() and len(text.split()) <= 8:
+                level = 2
+            elif few_words and text.isupper():
                 confidence += 0.4
             
-            # Common heading keywords (fast check)
-            major_words = ['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents']
-            if any(word in text.lower() for word in major_words):
+            # Common heading keywords (fast check); the match also gates the
+            # major-heading check below, which needs one of these words
+            major = STRUCTURE_MAJOR_RE.search(text_lower)
+            if major is not None:
                 confidence += 0.4
-                level = "H1"
+                level = 1
             
             # Form field detection (override to H3)
-            is_form_field = (len(text.split()) <= 8 and 
-                (text.lower() in ['designation', 'service', 'age', 'name', 'relationship'] or
-                 text.lower().startswith(('name of', 'date of', 'whether')) or
+            is_form_field = (few_words and 
+                (text_lower in FAST_FORM_FIELD_LABELS or
+                 text_lower.startswith(FAST_FORM_FIELD_PREFIXES) or
                  '+' in text))
             
             if is_form_field:
-                level = "H3"
+                level = 3
                 confidence = max(confidence, 0.5)
             
-            # Apply special handling for major headings
-            text_lower = text.lower()
-            if (text_lower in major_words or 
-                any(text_lower.startswith(f'{word} ') for word in major_words) or
-                re.match(r'^\d+\.?\s+(overview|introduction|conclusion|summary)', text_lower)):
-                level = "H1"
+            # Apply special handling for major headings: a bare or leading
+            # major word matches at 0, a numbered one ("1. Overview") after
+            # the number
+            if major is not None and (
+                (major.start() == 0 and
+                 (text_lower in MAJOR_HEADING_WORDS or
+                  text_lower.startswith(STRUCTURE_MAJOR_PREFIXES))) or
+                (digit_first and MAJOR_NUMBERED_RE.match(text_lower))):
+                level = 1
                 confidence = max(confidence, 0.8)
             
             if confidence > 0.4:  # Lower threshold for fast mode
-                headings.append({
-                    "level": level,
-                    "text": clean_heading_text(text),
-                    "page": block["page"]
-                })
-    
-    # Remove duplicates and sort
-    seen = set()
-    unique_headings = []
-    for heading in headings:
-        key = (heading["text"], heading["page"])
-        if key not in seen:
-            seen.add(key)
-            unique_headings.append(heading)
+                key = (text, block["page"])
+                if key not in unique:
+                    unique[key] = {
+                        "level": level_names[level - 1],
+                        "text": clean_heading_text(text),
+                        "page": block["page"]
+                    }
     
-    # Sort by page to maintain chronological order
-    unique_headings.sort(key=lambda x: x["page"])
+    unique_headings = list(unique.values())
     
+    # The block extractors emit pages in order and the loop above keeps block
+    # order, so the headings are already in chronological order
     return unique_headings
 
 if __name__ == "__main__":
@@ -7,6 +7,27 @@ import fitz  # PyMuPDF
 import math
 from typing import List, Dict, Tuple, Optional
 
+# Precompiled patterns for the fast detection and page-number checks
+NUMBERED_HEADING_RE = re.compile(r'^\d+\.?\s+[A-Z]')
+NUMBERED_H2_RE = re.compile(r'^\d+\.\d+\s+[A-Z]')
+PAGE_NUMBER_RE = re.compile(r'^(page\s*)?\d+$')
+
+# Title scoring and cleanup patterns
+TITLE_LINE_RE = re.compile(r'^[A-Z][A-Za-z\s\-–:]+$')
+WHITESPACE_RUN_RE = re.compile(r'\s+')
+TRAILING_DOTS_RE = re.compile(r'[\.]+$')
+
+# Major heading keywords as one alternation so each block is scanned once;
+# matched as substrings of the lowercased text
+MAJOR_WORDS_RE = re.compile('overview|introduction|conclusion|summary|abstract|contents')
+
+# Script patterns for detect_language_simple
+JAPANESE_KANA_RE = re.compile(r'[ひらがなカタカナ]')
+JAPANESE_CHAPTER_RE = re.compile(r'第[0-9一二三四五六七八九十]+[章節]')
+ARABIC_SCRIPT_RE = re.compile(r'[\u0600-\u06FF]')
+CJK_IDEOGRAPH_RE = re.compile(r'[\u4e00-\u9fff]')
+HANGUL_RE = re.compile(r'[\uAC00-\uD7AF]')
+
 # Docker-optimized version without heavy ML dependencies
 # Falls back to pattern-based multilingual detection
 
@@ -15,23 +36,58 @@ def detect_language_simple(text: str) -> str:
     text = text.strip()
     
     # Japanese patterns
-    if re.search(r'[ひらがなカタカナ]', text) or re.search(r'第[0-9一二三四五六七八九十]+[章節]', text):
+    if JAPANESE_KANA_RE.search(text) or JAPANESE_CHAPTER_RE.search(text):
         return 'japanese'
     
     # Arabic patterns
-    if re.search(r'[\u0600-\u06FF]', text):
+    if ARABIC_SCRIPT_RE.search(text):
         return 'arabic'
     
     # Chinese patterns
-    if re.search(r'[\u4e00-\u9fff]', text) and not re.search(r'[ひらがなカタカナ]', text):
+    if CJK_IDEOGRAPH_RE.search(text) and not JAPANESE_KANA_RE.search(text):
         return 'chinese'
     
     # Korean patterns
-    if re.search(r'[\uAC00-\uD7AF]', text):
+    if HANGUL_RE.search(text):
         return 'korean'
     
     return 'english'
 
+# Japanese patterns
+JAPANESE_HEADING_PATTERNS = [
+    (re.compile(r'^第[0-9０-９一二三四五六七八九十百千万]+章.*'), 0.9, "japanese_chapter"),
+    (re.compile(r'^第[0-9０-９一二三四五六七八九十百千万]+節.*'), 0.9, "japanese_section"),
+    (re.compile(r'^[0-9０-９]+[\.．][0-9０-９]*\s*.*'), 0.8, "japanese_numbered"),
+    (re.compile(r'^「.*」$'), 0.7, "japanese_quoted"),
+    (re.compile(r'^【.*】$'), 0.7, "japanese_bracketed"),
+    (re.compile(r'^■.*|^◆.*|^○.*'), 0.6, "japanese_bullet"),
+]
+
+# Arabic patterns
+ARABIC_HEADING_PATTERNS = [
+    (re.compile(r'^الفصل\s+[الأ]*[0-9٠-٩]+.*'), 0.9, "arabic_chapter"),
+    (re.compile(r'^القسم\s+[الأ]*[0-9٠-٩]+.*'), 0.9, "arabic_section"),
+    (re.compile(r'^[0-9٠-٩]+[\.]\s*.*'), 0.8, "arabic_numbered"),
+    (re.compile(r'^-\s+.*|^•\s+.*'), 0.6, "arabic_bullet"),
+]
+
+# Chinese patterns
+CHINESE_HEADING_PATTERNS = [
+    (re.compile(r'^第[0-9一二三四五六七八九十百千万]+章.*'), 0.9, "chinese_chapter"),
+    (re.compile(r'^第[0-9一二三四五六七八九十百千万]+节.*'), 0.9, "chinese_section"),
+    (re.compile(r'^第[0-9一二三四五六七八九十百千万]+節.*'), 0.9, "chinese_section_trad"),
+    (re.compile(r'^[0-9]+[\.]\s*.*'), 0.8, "chinese_numbered"),
+]
+
+# Universal patterns
+UNIVERSAL_HEADING_PATTERNS = [
+    (re.compile(r'^\d+\.\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]'), 0.9, "numbered_section"),
+    (re.compile(r'^\d+\.\d+\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]'), 0.9, "sub_numbered"),
+    (re.compile(r'^[IVX]+\.\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]'), 0.8, "roman_numeral"),
+    (re.compile(r'^[A-Z]{2,}(\s+[A-Z]+)*$'), 0.7, "all_caps"),
+    (re.compile(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$'), 0.6, "title_case"),
+]
+
 def is_multilingual_heading_pattern(text: str, language: str = None) -> Tuple[bool, float, str]:
     """Check if text matches multilingual heading patterns."""
     if not text or len(text.strip()) < 2:
@@ -46,55 +102,20 @@ def is_multilingual_heading_pattern(text: str, language: str = None) -> Tuple[bo
     max_confidence = 0.0
     best_pattern = ""
     
-    # Japanese patterns
-    japanese_patterns = [
-        (r'^第[0-9０-９一二三四五六七八九十百千万]+章.*', 0.9, "japanese_chapter"),
-        (r'^第[0-9０-９一二三四五六七八九十百千万]+節.*', 0.9, "japanese_section"),
-        (r'^[0-9０-９]+[\.．][0-9０-９]*\s*.*', 0.8, "japanese_numbered"),
-        (r'^「.*」$', 0.7, "japanese_quoted"),
-        (r'^【.*】$', 0.7, "japanese_bracketed"),
-        (r'^■.*|^◆.*|^○.*', 0.6, "japanese_bullet"),
-    ]
-    
-    # Arabic patterns
-    arabic_patterns = [
-        (r'^الفصل\s+[الأ]*[0-9٠-٩]+.*', 0.9, "arabic_chapter"),
-        (r'^القسم\s+[الأ]*[0-9٠-٩]+.*', 0.9, "arabic_section"),
-        (r'^[0-9٠-٩]+[\.]\s*.*', 0.8, "arabic_numbered"),
-        (r'^-\s+.*|^•\s+.*', 0.6, "arabic_bullet"),
-    ]
-    
-    # Chinese patterns
-    chinese_patterns = [
-        (r'^第[0-9一二三四五六七八九十百千万]+章.*', 0.9, "chinese_chapter"),
-        (r'^第[0-9一二三四五六七八九十百千万]+节.*', 0.9, "chinese_section"),
-        (r'^第[0-9一二三四五六七八九十百千万]+節.*', 0.9, "chinese_section_trad"),
-        (r'^[0-9]+[\.]\s*.*', 0.8, "chinese_numbered"),
-    ]
-    
-    # Universal patterns
-    universal_patterns = [
-        (r'^\d+\.\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]', 0.9, "numbered_section"),
-        (r'^\d+\.\d+\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]', 0.9, "sub_numbered"),
-        (r'^[IVX]+\.\s+[A-Z\u4e00-\u9fff\u0600-\u06ff]', 0.8, "roman_numeral"),
-        (r'^[A-Z]{2,}(\s+[A-Z]+)*$', 0.7, "all_caps"),
-        (r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*$', 0.6, "title_case"),
-    ]
-    
     # Check language-specific patterns
     all_patterns = []
     if language == 'japanese':
-        all_patterns.extend(japanese_patterns)
+        all_patterns.extend(JAPANESE_HEADING_PATTERNS)
     elif language == 'arabic':
-        all_patterns.extend(arabic_patterns)
+        all_patterns.extend(ARABIC_HEADING_PATTERNS)
     elif language == 'chinese':
-        all_patterns.extend(chinese_patterns)
+        all_patterns.extend(CHINESE_HEADING_PATTERNS)
     
     # Always check universal patterns
-    all_patterns.extend(universal_patterns)
+    all_patterns.extend(UNIVERSAL_HEADING_PATTERNS)
     
     for pattern, confidence, pattern_type in all_patterns:
-        if re.match(pattern, text):
+        if pattern.match(text):
             if confidence > max_confidence:
                 max_confidence = confidence
                 best_pattern = pattern_type
@@ -247,6 +268,41 @@ def calculate_structure_confidence_simple(block: Dict, all_blocks: List[Dict]) -
     
     return min(1.0, confidence)
 
+# Special patterns for H3
+H3_HEADING_PATTERNS = [
+    re.compile(r'^[a-z][\.\)]\s+'),  # "a. something", "i) something"
+    re.compile(r'^\([a-z0-9]+\)'),   # "(a)", "(1)"
+    re.compile(r'^-\s+'),            # "- item"
+    re.compile(r'^•\s+'),            # "• item" 
+    re.compile(r'^○\s+'),            # "○ item"
+    re.compile(r'^■\s+'),            # "■ item"
+    re.compile(r'^\d+\.\d+\.\d+'),   # "1.1.1 subsection"
+    re.compile(r'^[A-Z][\.\)]\s+[a-z]'),  # "A. something" (but lowercase after)
+]
+
+# Special patterns for H1 (document structure)
+H1_HEADING_PATTERNS = [
+    re.compile(r'^(CHAPTER|Chapter|章)\s+\d+'),
+    re.compile(r'^(PART|Part|部)\s+[IVX0-9]+'),
+    re.compile(r'^(SECTION|Section|節)\s+[A-Z0-9]+'),
+    re.compile(r'^[A-Z\s]{10,}$'),  # Long all-caps titles
+]
+
+# Address/contact info patterns (typically H3)
+CONTACT_INFO_PATTERNS = [
+    re.compile(r'.*@.*\.', re.IGNORECASE),          # Email addresses
+    re.compile(r'.*\d{3}[-\.\s]\d{3}', re.IGNORECASE),  # Phone numbers
+    re.compile(r'^(ADDRESS|PHONE|EMAIL|FAX)[\s:]+', re.IGNORECASE),
+    re.compile(r'^\d+\s+[A-Z][a-z]+\s+(Street|Ave|Road|Blvd)', re.IGNORECASE),  # Street addresses
+]
+
+# Form field patterns (typically H3)
+FORM_FIELD_PATTERNS = [
+    re.compile(r'^(Name|Date|Age|Department|Position|Designation)[\s:]*$', re.IGNORECASE),
+    re.compile(r'.*[_]{3,}.*', re.IGNORECASE),      # Underlines for filling
+    re.compile(r'^\d+\.\s*$', re.IGNORECASE),       # Just numbers like "1.", "2."
+]
+
 def determine_heading_level_simple(text: str, block: Dict, pattern_type: str) -> str:
     """Improved heading level determination with proper H1/H2/H3 distribution."""
     # Start with base scoring system
@@ -314,58 +370,23 @@ def determine_heading_level_simple(text: str, block: Dict, pattern_type: str) ->
     else:
         h1_score += 1
     
-    # Special patterns for H3
-    h3_patterns = [
-        r'^[a-z][\.\)]\s+',  # "a. something", "i) something"
-        r'^\([a-z0-9]+\)',   # "(a)", "(1)"
-        r'^-\s+',            # "- item"
-        r'^•\s+',            # "• item" 
-        r'^○\s+',            # "○ item"
-        r'^■\s+',            # "■ item"
-        r'^\d+\.\d+\.\d+',   # "1.1.1 subsection"
-        r'^[A-Z][\.\)]\s+[a-z]',  # "A. something" (but lowercase after)
-    ]
-    
-    for pattern in h3_patterns:
-        if re.match(pattern, text):
+    for pattern in H3_HEADING_PATTERNS:
+        if pattern.match(text):
             h3_score += 3
             break
     
-    # Special patterns for H1 (document structure)
-    h1_patterns = [
-        r'^(CHAPTER|Chapter|章)\s+\d+',
-        r'^(PART|Part|部)\s+[IVX0-9]+',
-        r'^(SECTION|Section|節)\s+[A-Z0-9]+',
-        r'^[A-Z\s]{10,}$',  # Long all-caps titles
-    ]
-    
-    for pattern in h1_patterns:
-        if re.match(pattern, text):
+    for pattern in H1_HEADING_PATTERNS:
+        if pattern.match(text):
             h1_score += 3
             break
     
-    # Address/contact info patterns (typically H3)
-    contact_patterns = [
-        r'.*@.*\.',          # Email addresses
-        r'.*\d{3}[-\.\s]\d{3}',  # Phone numbers
-        r'^(ADDRESS|PHONE|EMAIL|FAX)[\s:]+',
-        r'^\d+\s+[A-Z][a-z]+\s+(Street|Ave|Road|Blvd)',  # Street addresses
-    ]
-    
-    for pattern in contact_patterns:
-        if re.match(pattern, text, re.IGNORECASE):
+    for pattern in CONTACT_INFO_PATTERNS:
+        if pattern.match(text):
             h3_score += 4  # Strong preference for H3
             break
     
-    # Form field patterns (typically H3)
-    form_patterns = [
-        r'^(Name|Date|Age|Department|Position|Designation)[\s:]*$',
-        r'.*[_]{3,}.*',      # Underlines for filling
-        r'^\d+\.\s*$',       # Just numbers like "1.", "2."
-    ]
-    
-    for pattern in form_patterns:
-        if re.match(pattern, text, re.IGNORECASE):
+    for pattern in FORM_FIELD_PATTERNS:
+        if pattern.match(text):
             h3_score += 3
             break
     
@@ -639,7 +660,7 @@ def extract_title_advanced(text_blocks: List[Dict]) -> str:
         score += centering_score
         
         # Pattern bonus
-        if re.match(r'^[A-Z][A-Za-z\s\-–:]+$', text):
+        if TITLE_LINE_RE.match(text):
             score += 3
         
         candidate_scores[text] = score
@@ -744,18 +765,17 @@ def extract_outline_fast_enhanced(text_blocks: List[Dict], title: str) -> List[D
                     level = "H2"
             
             # Pattern detection (fast)
-            if re.match(r'^\d+\.?\s+[A-Z]', text):
+            if NUMBERED_HEADING_RE.match(text):
                 confidence += 0.5
                 level = "H1"
-            elif re.match(r'^\d+\.\d+\s+[A-Z]', text):
+            elif NUMBERED_H2_RE.match(text):
                 confidence += 0.5
                 level = "H2"
             elif text.isupper() and len(text.split()) <= 8:
                 confidence += 0.4
             
             # Common heading keywords (fast check)
-            major_words = ['overview', 'introduction', 'conclusion', 'summary', 'abstract', 'contents']
-            if any(word in text.lower() for word in major_words):
+            if MAJOR_WORDS_RE.search(text.lower()):
                 confidence += 0.4
                 level = "H1"
             
@@ -794,9 +814,9 @@ def detect_quick_patterns(text_blocks: List[Dict]) -> List[Dict]:
             confidence = 0
             
             # Quick pattern checks (most obvious heading patterns)
-            if re.match(r'^\d+\.?\s+[A-Z]', text):  # "1. Introduction"
+            if NUMBERED_HEADING_RE.match(text):  # "1. Introduction"
                 confidence = 0.9
-            elif re.match(r'^\d+\.\d+\s+[A-Z]', text):  # "2.1 Something"
+            elif NUMBERED_H2_RE.match(text):  # "2.1 Something"
                 confidence = 0.8
             elif text.isupper() and len(text.split()) <= 6:  # All caps
                 confidence = 0.7
@@ -819,9 +839,7 @@ def is_page_number(text):
     text = text.strip()
     if text.isdigit() and len(text) <= 3:
         return True
-    if re.match(r'^(page\s*)?\d+$', text.lower()):
-        return True
-    if re.match(r'^\d+\s*$', text):
+    if PAGE_NUMBER_RE.match(text.lower()):
         return True
     return False
 
@@ -832,7 +850,7 @@ def is_page_number_fast(text: str) -> bool:
         return False
     if text.isdigit() and len(text) <= 3:
         return True
-    return bool(re.match(r'^(page\s*)?\d+$', text.lower()))
+    return bool(PAGE_NUMBER_RE.match(text.lower()))
 
 def is_header_footer(block: Dict, all_blocks: List[Dict]) -> bool:
     """Check if block is likely a header or footer."""
@@ -860,10 +878,10 @@ def clean_heading_text(text):
 def clean_title_text(text: str) -> str:
     """Clean and normalize title text."""
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = WHITESPACE_RUN_RE.sub(' ', text.strip())
     
     # Remove trailing punctuation except for appropriate cases
-    text = re.sub(r'[\.]+$', '', text)
+    text = TRAILING_DOTS_RE.sub('', text)
     
     return text
 
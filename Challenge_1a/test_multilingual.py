@@ -205,6 +205,69 @@ def test_multilingual_integration():
     
     return len(unique_languages)
 
+def test_bookmark_anchors():
+    """Test merging a short bookmark outline into the detected headings."""
+    print("\n=== Testing Bookmark Anchors ===\n")
+    
+    # Needs the real pipeline (and PyMuPDF for the empty-text case)
+    from process_pdfs import extract_title_and_outline, merge_bookmark_anchors
+    
+    detected = [
+        {"level": "H2", "text": "Introduction", "page": 1},
+        {"level": "H2", "text": "Methods", "page": 3},
+    ]
+    
+    def check(name, actual, expected):
+        ok = actual == expected
+        print(f"{'✓' if ok else '✗'} {name}")
+        if not ok:
+            print(f"    Expected: {expected}")
+            print(f"    Got:      {actual}")
+        return ok
+    
+    results = [
+        # A bookmark replaces the detected heading with the same text (ignoring
+        # case and spacing) on the same page; the same text elsewhere stays
+        check("Bookmark replaces matching heading on the same page",
+              merge_bookmark_anchors(detected, [{"level": "H1", "text": "INTRODUCTION ", "page": 1}], "Report"),
+              [{"level": "H1", "text": "INTRODUCTION ", "page": 1},
+               {"level": "H2", "text": "Methods", "page": 3}]),
+        check("Bookmark on another page is merged in page order",
+              merge_bookmark_anchors(detected, [{"level": "H1", "text": "Methods", "page": 2}], "Report"),
+              [{"level": "H2", "text": "Introduction", "page": 1},
+               {"level": "H1", "text": "Methods", "page": 2},
+               {"level": "H2", "text": "Methods", "page": 3}]),
+        
+        # Bookmarks that only repeat the title, or point at no page, are dropped
+        check("Title-only bookmark is dropped",
+              merge_bookmark_anchors(detected, [{"level": "H1", "text": "Annual  report", "page": 1}], "Annual Report"),
+              detected),
+        check("Bookmark without a valid page is dropped",
+              merge_bookmark_anchors(detected, [{"level": "H1", "text": "Appendix", "page": -1}], "Report"),
+              detected),
+    ]
+    
+    # A PDF with bookmarks but no extractable text returns its bookmarks
+    # (bypassing the on-disk result cache)
+    import fitz  # PyMuPDF
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page()
+    doc.set_toc([[1, "Overview", 1], [2, "Details", 2]])
+    doc.set_metadata({"title": "Scanned Report"})
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    
+    extract = getattr(extract_title_and_outline, "__wrapped__", extract_title_and_outline)
+    results.append(check("PDF without text returns its bookmark outline",
+                         extract("scanned.pdf", pdf_bytes),
+                         ("Scanned Report", [{"level": "H1", "text": "Overview", "page": 1},
+                                             {"level": "H2", "text": "Details", "page": 2}])))
+    
+    passed = sum(results)
+    print(f"\nBookmark anchor checks passed: {passed}/{len(results)}")
+    return passed == len(results)
+
 if __name__ == "__main__":
     print("Multilingual PDF Heading Extraction - Functionality Test")
     print("=" * 60)
@@ -214,6 +277,7 @@ if __name__ == "__main__":
     heading_count = test_font_analysis()
     test_performance_simulation()
     language_count = test_multilingual_integration()
+    bookmarks_ok = test_bookmark_anchors()
     
     # Summary
     print("\n" + "=" * 60)
@@ -222,11 +286,13 @@ if __name__ == "__main__":
     print(f"Pattern recognition success rate: {pattern_success:.1f}%")
     print(f"Headings detected: {heading_count}")
     print(f"Languages supported: {language_count}")
+    print(f"Bookmark anchors: {'✓ Working' if bookmarks_ok else '✗ Broken'}")
     print(f"Performance requirement: ✓ Met (estimated <5s for 50 pages)")
     
     overall_success = (pattern_success >= 80 and 
                       heading_count >= 4 and 
-                      language_count >= 3)
+                      language_count >= 3 and
+                      bookmarks_ok)
     
     print(f"Overall functionality: {'✓ PASS' if overall_success else '✗ FAIL'}")
     